@@ -4,12 +4,14 @@ Implementation for Phase 5.3: Advanced Backup System
 """
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import logging
 import os
 import asyncio
 import json
 import hashlib
+import time
+import functools
 from datetime import datetime, timedelta
 import io
 import zipfile
@@ -19,6 +21,43 @@ from typing import Optional, Dict, List, Any, Union, Tuple
 
 logger = logging.getLogger("accountme_bot.backup_cog")
 
+# Seconds an inventory snapshot CSV is reused while list_products returns the same cached list
+SNAPSHOT_CACHE_TTL = 300
+
+# Product columns written to inventory snapshot CSVs, followed by a snapshot_date column
+SNAPSHOT_PRODUCT_FIELDS = (
+    'product_id', 'name', 'category', 'subcategory',
+    'manufacturer', 'vendor', 'style', 'color', 'size',
+    'sku', 'quantity', 'cost_price', 'selling_price'
+)
+
+# Backup records deleted per DELETE statement during retention cleanup; stays well
+# under SQLite's default limit of 999 bound parameters
+CLEANUP_BATCH_SIZE = 500
+
+# Seconds the recent backup list is reused between commands
+RECENT_BACKUPS_TTL = 10
+
+# Most recent backups fetched for listing; an embed holds at most 25 fields
+RECENT_BACKUPS_LIMIT = 25
+
+async def _run_in_thread(func, *args, **kwargs):
+    """
+    Run a blocking call on the loop's default executor
+    
+    Stands in for asyncio.to_thread, which needs Python 3.9.
+    
+    Args:
+        func: Function to call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
 class BackupCog(commands.Cog, name="Backup"):
     """Advanced backup management commands for database and inventory"""
     
@@ -64,12 +103,20 @@ class BackupCog(commands.Cog, name="Backup"):
         # Get backup rotation scheme
         self.rotation_scheme = os.getenv("BACKUP_ROTATION_SCHEME", "simple")
         
-        # Initialize backup task
-        self.backup_task = None
+        # Last inventory snapshot as (products, built_at, snapshot_date, csv_data); products is
+        # the list it was built from, which the manager replaces whenever a product changes
+        self._snapshot = None
+        
+        # Last backup channel lookup as (channel_id, channel), cleared when that channel changes
+        self._channel_cache = None
+        
+        # Recent backup records shared by commands as (fetch_time, backups)
+        self._recent_backups = None
         
         # Start scheduled backup task if interval is set
         if self.backup_interval_hours > 0:
-            self.backup_task = self.bot.loop.create_task(self._scheduled_backup_task())
+            self._scheduled_backup_task.change_interval(hours=self.backup_interval_hours)
+            self._scheduled_backup_task.start()
             logger.info(f"Scheduled backup task started with interval of {self.backup_interval_hours} hours")
             
         logger.info(f"Backup system initialized with cloud provider: {self.cloud_provider}")
@@ -79,35 +126,55 @@ class BackupCog(commands.Cog, name="Backup"):
     
     def cog_unload(self):
         """Called when the cog is unloaded"""
-        if self.backup_task:
-            self.backup_task.cancel()
+        if self._scheduled_backup_task.is_running():
+            self._scheduled_backup_task.cancel()
             logger.info("Scheduled backup task cancelled")
     
+    @tasks.loop(hours=24)
     async def _scheduled_backup_task(self):
-        """Task for scheduled backups"""
+        """Task for scheduled backups; the interval is set from backup_interval_hours"""
         try:
-            # Wait for bot to be ready
-            await self.bot.wait_until_ready()
+            # Perform backup
+            logger.info("Running scheduled backup")
+            await self._create_backup(scheduled=True)
+            
+            # Clean up old backups
+            await self._cleanup_old_backups()
             
-            while not self.bot.is_closed():
-                try:
-                    # Perform backup
-                    logger.info("Running scheduled backup")
-                    await self._create_backup(scheduled=True)
-                    
-                    # Clean up old backups
-                    await self._cleanup_old_backups()
-                    
-                except Exception as e:
-                    logger.error(f"Error in scheduled backup: {str(e)}")
-                
-                # Wait for next backup interval
-                await asyncio.sleep(self.backup_interval_hours * 3600)  # Convert hours to seconds
-        
-        except asyncio.CancelledError:
-            logger.info("Scheduled backup task cancelled")
         except Exception as e:
-            logger.error(f"Unexpected error in backup task: {str(e)}")
+            # Log and keep the loop running; an unhandled error would stop it
+            logger.error(f"Error in scheduled backup: {str(e)}")
+    
+    @_scheduled_backup_task.before_loop
+    async def _before_scheduled_backup_task(self):
+        """Wait for the bot to be ready before the first scheduled backup"""
+        await self.bot.wait_until_ready()
+    
+    def _get_backup_channel(self) -> Optional[discord.abc.Messageable]:
+        """
+        Get the configured backup channel, reusing the last lookup while the ID is unchanged
+        
+        Returns:
+            The backup channel, or None if it cannot be found
+        """
+        if self._channel_cache is not None and self._channel_cache[0] == self.backup_channel_id:
+            return self._channel_cache[1]
+        
+        channel = self.bot.get_channel(self.backup_channel_id)
+        self._channel_cache = (self.backup_channel_id, channel) if channel else None
+        return channel
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        """Drop the cached backup channel when it is edited"""
+        if self._channel_cache is not None and self._channel_cache[0] == before.id:
+            self._channel_cache = None
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        """Drop the cached backup channel when it is deleted"""
+        if self._channel_cache is not None and self._channel_cache[0] == channel.id:
+            self._channel_cache = None
     
     async def _create_backup(self, ctx=None, scheduled=False) -> Optional[str]:
         """
@@ -121,19 +188,23 @@ class BackupCog(commands.Cog, name="Backup"):
             Path to the backup file, or None if backup failed
         """
         try:
-            # Create database backup with compression and integrity verification
-            backup_path = self.bot.db_manager.backup_database(
+            # Create database backup with compression and integrity verification; the
+            # copy, checksum and file reads below run in worker threads so the event
+            # loop keeps serving the gateway while a large database is backed up
+            backup_path = await _run_in_thread(
+                self.bot.db_manager.backup_database,
                 compress=self.compression_enabled
             )
             backup_filename = os.path.basename(backup_path)
             backup_size = os.path.getsize(backup_path)
             
             logger.info(f"Database backup created: {backup_path} ({backup_size} bytes)")
+            self._recent_backups = None
             
             # Verify backup integrity
             if self.verify_integrity:
                 logger.info(f"Verifying backup integrity: {backup_path}")
-                if not self.bot.db_manager.verify_backup_integrity(backup_path):
+                if not await _run_in_thread(self.bot.db_manager.verify_backup_integrity, backup_path):
                     logger.error(f"Backup integrity verification failed: {backup_path}")
                     if ctx:
                         await ctx.send("⚠️ Backup created but integrity verification failed. The backup may be corrupted.")
@@ -162,7 +233,7 @@ class BackupCog(commands.Cog, name="Backup"):
             discord_url = None
             if self.backup_channel_id:
                 # Get the backup channel
-                channel = self.bot.get_channel(self.backup_channel_id)
+                channel = self._get_backup_channel()
                 
                 if channel:
                     # Create backup info embed
@@ -187,7 +258,7 @@ class BackupCog(commands.Cog, name="Backup"):
                     embed.add_field(name="Compressed", value="✅ Yes" if self.compression_enabled else "❌ No", inline=True)
                     
                     # Add inventory summary
-                    products = self.bot.db_manager.list_products()
+                    products = await _run_in_thread(self.bot.db_manager.list_products)
                     total_products = len(products)
                     total_items = sum(p['quantity'] for p in products)
                     total_value = sum(p['quantity'] * (p['cost_price'] or 0) for p in products)
@@ -197,20 +268,20 @@ class BackupCog(commands.Cog, name="Backup"):
                     embed.add_field(name="Value", value=f"${total_value:.2f}", inline=True)
                     
                     # Create inventory snapshot CSV
-                    csv_data = await self._generate_inventory_snapshot(products)
+                    csv_data = await _run_in_thread(self._generate_inventory_snapshot, products)
                     inventory_file = discord.File(
                         io.BytesIO(csv_data.encode('utf-8')),
                         filename=f"inventory_snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
                     )
                     
-                    # Upload database backup file
-                    with open(backup_path, 'rb') as f:
-                        db_file = discord.File(f, filename=backup_filename)
-                        message = await channel.send(
-                            content=f"{'Scheduled' if scheduled else 'Manual'} backup - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                            embed=embed,
-                            files=[db_file, inventory_file]
-                        )
+                    # Upload database backup file; discord.File opens the path itself and
+                    # the HTTP client streams it in chunks instead of holding it in memory
+                    db_file = discord.File(backup_path, filename=backup_filename)
+                    message = await channel.send(
+                        content=f"{'Scheduled' if scheduled else 'Manual'} backup - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                        embed=embed,
+                        files=[db_file, inventory_file]
+                    )
                     
                     # Update backup record with Discord URL
                     discord_url = message.attachments[0].url if message.attachments else None
@@ -248,7 +319,7 @@ class BackupCog(commands.Cog, name="Backup"):
             if ctx:
                 await ctx.send(f"Error creating backup: {str(e)}")
             return None
-            
+    
     async def _upload_to_cloud(self, backup_path: str) -> Optional[str]:
         """
         Upload a backup file to the configured cloud storage provider
@@ -315,9 +386,14 @@ class BackupCog(commands.Cog, name="Backup"):
         # In a real implementation, you would return the actual URL
         return f"https://onedrive.live.com/placeholder/{os.path.basename(file_path)}"
     
-    async def _generate_inventory_snapshot(self, products: List[Dict[str, Any]]) -> str:
+    def _generate_inventory_snapshot(self, products: List[Dict[str, Any]]) -> str:
         """
-        Generate a CSV snapshot of the current inventory
+        Generate a CSV snapshot of the current inventory; called in a worker thread
+        
+        The CSV is reused for SNAPSHOT_CACHE_TTL seconds while products is the same list the
+        last snapshot was built from. The database manager caches list_products and drops that
+        list on every product write, so an identical list means unchanged rows; only the
+        snapshot_date column is rewritten on reuse.
         
         Args:
             products: List of product dictionaries
@@ -328,29 +404,92 @@ class BackupCog(commands.Cog, name="Backup"):
         import csv
         import io
         
+        now = time.monotonic()
+        snapshot_date = datetime.now().isoformat()
+        cached = self._snapshot
+        if cached is not None and cached[0] is products and now - cached[1] < SNAPSHOT_CACHE_TTL:
+            # snapshot_date ends every data row, so rewriting it keeps the row anchors intact
+            return cached[3].replace(f",{cached[2]}\r\n", f",{snapshot_date}\r\n")
+        
         output = io.StringIO()
-        fieldnames = [
-            'product_id', 'name', 'category', 'subcategory', 
-            'manufacturer', 'vendor', 'style', 'color', 'size', 
-            'sku', 'quantity', 'cost_price', 'selling_price',
-            'snapshot_date'
-        ]
+        writer = csv.writer(output)
+        writer.writerow(SNAPSHOT_PRODUCT_FIELDS + ('snapshot_date',))
+        
+        # Build each row as a plain list and hand them all to writerows in one call,
+        # instead of copying every product dict and writing it through DictWriter
+        writer.writerows(
+            [*map(product.get, SNAPSHOT_PRODUCT_FIELDS), snapshot_date]
+            for product in products
+        )
         
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
+        csv_data = output.getvalue()
+        self._snapshot = (products, now, snapshot_date, csv_data)
+        return csv_data
+    
+    def _build_snapshot_payload(self, products: List[Dict[str, Any]]) -> Tuple[bytes, discord.Embed]:
+        """
+        Generate and encode an inventory snapshot and build its summary embed; called in a
+        worker thread
         
-        snapshot_date = datetime.now().isoformat()
+        Args:
+            products: List of product dictionaries
+            
+        Returns:
+            Tuple of the UTF-8 encoded CSV and the summary embed
+        """
+        embed = discord.Embed(
+            title="Inventory Snapshot",
+            description=f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            color=discord.Color.blue()
+        )
         
+        # Tally the category breakdown in one pass over the products, reading each
+        # product's fields once; the overall totals come from the per-category sums
+        categories = {}
         for product in products:
-            # Add snapshot date to each row
-            product_copy = dict(product)
-            product_copy['snapshot_date'] = snapshot_date
-            
-            # Only write the fields we want
-            row = {field: product_copy.get(field) for field in fieldnames}
-            writer.writerow(row)
+            quantity = product['quantity']
+            stats = categories.setdefault(product['category'], [0, 0, 0])
+            stats[0] += 1
+            stats[1] += quantity
+            stats[2] += quantity * (product['cost_price'] or 0)
+        
+        # Add summary statistics
+        total_products = len(products)
+        total_items = sum(stats[1] for stats in categories.values())
+        total_value = sum(stats[2] for stats in categories.values())
+        
+        embed.add_field(name="Total Products", value=str(total_products), inline=True)
+        embed.add_field(name="Total Items", value=str(total_items), inline=True)
+        embed.add_field(name="Total Value", value=f"${total_value:.2f}", inline=True)
+        
+        # Add category breakdown
+        category_text = ""
+        for category, (count, items, value) in categories.items():
+            category_text += f"**{category.capitalize()}**: {count} products, {items} items, ${value:.2f}\n"
+        
+        if category_text:
+            embed.add_field(name="Category Breakdown", value=category_text, inline=False)
+        
+        return self._generate_inventory_snapshot(products).encode('utf-8'), embed
+    
+    async def _fetch_recent_backups(self) -> List[Dict[str, Any]]:
+        """
+        Fetch the most recent backup records, newest first
+        
+        The list is reused for RECENT_BACKUPS_TTL seconds and dropped whenever this cog
+        creates, cleans up or restores a backup.
         
-        return output.getvalue()
+        Returns:
+            Up to RECENT_BACKUPS_LIMIT backup records
+        """
+        now = time.monotonic()
+        if self._recent_backups is not None and now - self._recent_backups[0] < RECENT_BACKUPS_TTL:
+            return self._recent_backups[1]
+        
+        query = "SELECT * FROM backup_log ORDER BY timestamp DESC LIMIT ?"
+        backups = await _run_in_thread(self.bot.db_manager.execute_query, query, (RECENT_BACKUPS_LIMIT,))
+        self._recent_backups = (now, backups)
+        return backups
     
     async def _cleanup_old_backups(self):
         """Clean up old backups based on retention policy"""
@@ -362,9 +501,10 @@ class BackupCog(commands.Cog, name="Backup"):
             cutoff_date = datetime.now() - timedelta(days=self.backup_retention_days)
             cutoff_date_str = cutoff_date.isoformat()
             
-            # Get backup records older than cutoff date
-            query = "SELECT * FROM backup_log WHERE timestamp < ?"
-            old_backups = self.bot.db_manager.execute_query(query, (cutoff_date_str,))
+            # Get backup records older than cutoff date; the comparison runs in SQLite
+            # on the indexed ISO-8601 timestamps, so no rows are parsed in Python
+            query = "SELECT backup_id, filename, location FROM backup_log WHERE timestamp < ?"
+            old_backups = await _run_in_thread(self.bot.db_manager.execute_query, query, (cutoff_date_str,))
             
             if not old_backups:
                 logger.info("No old backups to clean up")
@@ -372,25 +512,52 @@ class BackupCog(commands.Cog, name="Backup"):
             
             logger.info(f"Found {len(old_backups)} backups older than {self.backup_retention_days} days")
             
-            # Delete old backup files
-            for backup in old_backups:
-                backup_path = os.path.join(backup['location'], backup['filename'])
-                if os.path.exists(backup_path):
-                    try:
-                        os.remove(backup_path)
-                        logger.info(f"Deleted old backup file: {backup_path}")
-                    except Exception as e:
-                        logger.error(f"Error deleting backup file {backup_path}: {str(e)}")
-                
-                # Delete backup record
-                self.bot.db_manager.delete('backup_log', 'backup_id = ?', (backup['backup_id'],))
-                logger.info(f"Deleted backup record: {backup['backup_id']}")
+            # Delete old backup files in one worker-thread call
+            backup_paths = [os.path.join(backup['location'], backup['filename']) for backup in old_backups]
+            await _run_in_thread(self._delete_backup_files, backup_paths)
+            
+            # Delete backup records in a worker thread, since bulk() waits on the write lock
+            backup_ids = [backup['backup_id'] for backup in old_backups]
+            await _run_in_thread(self._delete_backup_records, backup_ids)
             
+            self._recent_backups = None
             logger.info(f"Cleanup completed: removed {len(old_backups)} old backups")
         
         except Exception as e:
             logger.error(f"Error cleaning up old backups: {str(e)}")
     
+    def _delete_backup_records(self, backup_ids: List[int]) -> None:
+        """
+        Delete backup_log rows in batches of one statement each, all committed together
+        in a single transaction; called in a worker thread
+        
+        Args:
+            backup_ids: IDs of the backup records to delete
+        """
+        db = self.bot.db_manager
+        with db.bulk(tables=('backup_log',)):
+            for start in range(0, len(backup_ids), CLEANUP_BATCH_SIZE):
+                batch = backup_ids[start:start + CLEANUP_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch))
+                db.delete('backup_log', f'backup_id IN ({placeholders})', tuple(batch))
+                logger.info(f"Deleted backup records: {', '.join(map(str, batch))}")
+    
+    @staticmethod
+    def _delete_backup_files(backup_paths: List[str]) -> None:
+        """
+        Delete backup files that still exist; called in a worker thread
+        
+        Args:
+            backup_paths: Paths of the backup files to delete
+        """
+        for backup_path in backup_paths:
+            if os.path.exists(backup_path):
+                try:
+                    os.remove(backup_path)
+                    logger.info(f"Deleted old backup file: {backup_path}")
+                except Exception as e:
+                    logger.error(f"Error deleting backup file {backup_path}: {str(e)}")
+    
     @commands.command(name="backup", aliases=["createbackup", "backupnow"])
     @commands.has_permissions(administrator=True)
     async def backup_command(self, ctx):
@@ -416,18 +583,24 @@ class BackupCog(commands.Cog, name="Backup"):
         
         Aliases: !backups, !showbackups
         """
+        # Only RECENT_BACKUPS_LIMIT backups are fetched, which is also the embed field limit
+        clamped_limit = max(1, min(limit, RECENT_BACKUPS_LIMIT))
+        
         # Get backup records
-        query = "SELECT * FROM backup_log ORDER BY timestamp DESC LIMIT ?"
-        backups = self.bot.db_manager.execute_query(query, (limit,))
+        backups = (await self._fetch_recent_backups())[:clamped_limit]
         
         if not backups:
             await ctx.send("No backup records found.")
             return
         
+        description = f"Showing {len(backups)} most recent backups"
+        if clamped_limit != limit:
+            description += f" (limit must be between 1 and {RECENT_BACKUPS_LIMIT}; used {clamped_limit})"
+        
         # Create embed
         embed = discord.Embed(
             title="Database Backups",
-            description=f"Showing {len(backups)} most recent backups",
+            description=description,
             color=discord.Color.blue()
         )
         
@@ -513,12 +686,15 @@ class BackupCog(commands.Cog, name="Backup"):
                     return
                 
                 # Create a new backup before restoring (just in case)
-                pre_restore_backup = self.bot.db_manager.backup_database(
+                pre_restore_backup = await _run_in_thread(
+                    self.bot.db_manager.backup_database,
                     backup_dir=os.path.join(os.path.dirname(backup_path), "pre_restore")
                 )
                 
-                # Restore from backup
+                # Restore from backup; restore_database holds the manager's write lock while
+                # it closes and reopens the connection, so worker threads wait for it
                 success = self.bot.db_manager.restore_database(backup_path)
+                self._recent_backups = None
                 
                 if success:
                     await ctx.send(f"Database successfully restored from backup ID: {backup_id}")
@@ -552,7 +728,7 @@ class BackupCog(commands.Cog, name="Backup"):
         if channel is None:
             # Show current backup channel
             if self.backup_channel_id:
-                channel = self.bot.get_channel(self.backup_channel_id)
+                channel = self._get_backup_channel()
                 if channel:
                     await ctx.send(f"Current backup channel: {channel.mention}")
                 else:
@@ -563,6 +739,7 @@ class BackupCog(commands.Cog, name="Backup"):
         
         # Set new backup channel
         self.backup_channel_id = channel.id
+        self._channel_cache = (channel.id, channel)
         
         # Update environment variable (this won't persist after restart)
         os.environ["BACKUP_CHANNEL_ID"] = str(channel.id)
@@ -594,9 +771,8 @@ class BackupCog(commands.Cog, name="Backup"):
         if interval_hours is None:
             # Show current schedule
             if self.backup_interval_hours > 0:
-                next_backup = datetime.now() + timedelta(
-                    seconds=self.backup_task._when - asyncio.get_event_loop().time()
-                ) if self.backup_task else None
+                next_iteration = self._scheduled_backup_task.next_iteration
+                next_backup = next_iteration.astimezone() if next_iteration else None
                 
                 await ctx.send(
                     f"Current backup schedule: Every {self.backup_interval_hours} hours\n"
@@ -617,16 +793,14 @@ class BackupCog(commands.Cog, name="Backup"):
         # Update environment variable (this won't persist after restart)
         os.environ["BACKUP_INTERVAL_HOURS"] = str(interval_hours)
         
-        # Cancel existing task if any
-        if self.backup_task:
-            self.backup_task.cancel()
-            self.backup_task = None
-        
         if interval_hours > 0:
-            # Start new task
-            self.backup_task = self.bot.loop.create_task(self._scheduled_backup_task())
+            # Reschedule the running task, or start it if backups were disabled
+            self._scheduled_backup_task.change_interval(hours=interval_hours)
+            if not self._scheduled_backup_task.is_running():
+                self._scheduled_backup_task.start()
             await ctx.send(f"Backup schedule set to every {interval_hours} hours")
         else:
+            self._scheduled_backup_task.cancel()
             await ctx.send("Scheduled backups disabled")
     
     @commands.command(name="backupretention")
@@ -680,72 +854,26 @@ class BackupCog(commands.Cog, name="Backup"):
         
         try:
             # Get all products
-            products = self.bot.db_manager.list_products()
+            products = await _run_in_thread(self.bot.db_manager.list_products)
             
             if not products:
                 await ctx.send("No products found in inventory.")
                 return
             
-            # Generate CSV snapshot
-            csv_data = await self._generate_inventory_snapshot(products)
-            
-            # Create file
+            # Generate and encode the CSV and build the summary embed off the event loop
             snapshot_filename = f"inventory_snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            file = discord.File(
-                io.BytesIO(csv_data.encode('utf-8')),
-                filename=snapshot_filename
-            )
-            
-            # Create summary embed
-            embed = discord.Embed(
-                title="Inventory Snapshot",
-                description=f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                color=discord.Color.blue()
-            )
-            
-            # Add summary statistics
-            total_products = len(products)
-            total_items = sum(p['quantity'] for p in products)
-            total_value = sum(p['quantity'] * (p['cost_price'] or 0) for p in products)
-            
-            embed.add_field(name="Total Products", value=str(total_products), inline=True)
-            embed.add_field(name="Total Items", value=str(total_items), inline=True)
-            embed.add_field(name="Total Value", value=f"${total_value:.2f}", inline=True)
-            
-            # Add category breakdown
-            categories = {}
-            for product in products:
-                category = product['category']
-                if category not in categories:
-                    categories[category] = {
-                        'count': 0,
-                        'items': 0,
-                        'value': 0
-                    }
-                
-                categories[category]['count'] += 1
-                categories[category]['items'] += product['quantity']
-                categories[category]['value'] += product['quantity'] * (product['cost_price'] or 0)
-            
-            category_text = ""
-            for category, stats in categories.items():
-                category_text += f"**{category.capitalize()}**: {stats['count']} products, {stats['items']} items, ${stats['value']:.2f}\n"
-            
-            if category_text:
-                embed.add_field(name="Category Breakdown", value=category_text, inline=False)
+            csv_bytes, embed = await _run_in_thread(self._build_snapshot_payload, products)
+            file = discord.File(io.BytesIO(csv_bytes), filename=snapshot_filename)
             
             # Send file and embed
             await ctx.send(embed=embed, file=file)
             
             # If backup channel is set, also send there
             if self.backup_channel_id:
-                channel = self.bot.get_channel(self.backup_channel_id)
+                channel = self._get_backup_channel()
                 if channel:
                     # Create a new file object since the first one is consumed
-                    backup_file = discord.File(
-                        io.BytesIO(csv_data.encode('utf-8')),
-                        filename=snapshot_filename
-                    )
+                    backup_file = discord.File(io.BytesIO(csv_bytes), filename=snapshot_filename)
                     await channel.send(
                         content=f"Inventory snapshot - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
                         embed=embed,
@@ -786,7 +914,7 @@ class BackupCog(commands.Cog, name="Backup"):
         await ctx.send(f"Verifying integrity of backup ID {backup_id}... This may take a moment.")
         
         # Verify backup integrity
-        success = self.bot.db_manager.verify_backup_integrity(backup_path)
+        success = await _run_in_thread(self.bot.db_manager.verify_backup_integrity, backup_path)
         
         if success:
             await ctx.send(f"✅ Backup ID {backup_id} integrity verified successfully.")
@@ -887,11 +1015,19 @@ class BackupCog(commands.Cog, name="Backup"):
         size_query = "SELECT SUM(size) as total_size FROM backup_log"
         latest_query = "SELECT * FROM backup_log ORDER BY backup_id DESC LIMIT 1"
         
-        total_backups = self.bot.db_manager.execute_query(total_query)[0]['count']
-        verified_backups = self.bot.db_manager.execute_query(verified_query)[0]['count']
-        cloud_backups = self.bot.db_manager.execute_query(cloud_query)[0]['count']
-        total_size = self.bot.db_manager.execute_query(size_query)[0]['total_size'] or 0
-        latest_backup = self.bot.db_manager.execute_query(latest_query)
+        def fetch_statistics():
+            execute_query = self.bot.db_manager.execute_query
+            return (
+                execute_query(total_query)[0]['count'],
+                execute_query(verified_query)[0]['count'],
+                execute_query(cloud_query)[0]['count'],
+                execute_query(size_query)[0]['total_size'] or 0,
+                execute_query(latest_query)
+            )
+        
+        # Run all five queries in one worker-thread call
+        total_backups, verified_backups, cloud_backups, total_size, latest_backup = \
+            await _run_in_thread(fetch_statistics)
         
         # Create status embed
         embed = discord.Embed(
@@ -939,14 +1075,13 @@ class BackupCog(commands.Cog, name="Backup"):
             )
         
         # Add next scheduled backup info
-        if self.backup_interval_hours > 0 and self.backup_task:
-            next_backup = datetime.now() + timedelta(
-                seconds=self.backup_task._when - asyncio.get_event_loop().time()
-            )
+        next_iteration = self._scheduled_backup_task.next_iteration
+        if self.backup_interval_hours > 0 and next_iteration:
+            next_backup = next_iteration.astimezone()
             
             embed.add_field(name="Next Scheduled Backup", value=
                 f"**Date:** {next_backup.strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"**Time Remaining:** {(next_backup - datetime.now()).total_seconds() / 3600:.1f} hours",
+                f"**Time Remaining:** {(next_iteration - discord.utils.utcnow()).total_seconds() / 3600:.1f} hours",
                 inline=False
             )
         
@@ -1030,14 +1165,14 @@ class BackupCog(commands.Cog, name="Backup"):
                 await ctx.send("Generating CSV export from backup...")
                 
                 # Get all products
-                products = self.bot.db_manager.list_products()
+                products = await _run_in_thread(self.bot.db_manager.list_products)
                 
                 if not products:
                     await ctx.send("No products found in database.")
                     return
                 
                 # Generate CSV snapshot
-                csv_data = await self._generate_inventory_snapshot(products)
+                csv_data = await _run_in_thread(self._generate_inventory_snapshot, products)
                 
                 # Create file
                 file = discord.File(
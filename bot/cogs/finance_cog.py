@@ -995,7 +995,7 @@ class FinanceCog(commands.Cog, name="Finance"):
             message_id = ctx.message.id
             
             # Get the image processor and store the URL
-            image_processor = self.bot.get_image_processor()
+            image_processor = self.bot.image_processor
             if not image_processor:
                 # Fallback if image processor is not available
                 receipt_url = image_url
@@ -1466,7 +1466,7 @@ class FinanceCog(commands.Cog, name="Finance"):
         """
         try:
             # Get report generator
-            report_generator = self.bot.get_report_generator()
+            report_generator = self.bot.report_generator
             if not report_generator:
                 await ctx.send("Report generator is not available.")
                 return
@@ -1585,7 +1585,7 @@ class FinanceCog(commands.Cog, name="Finance"):
         """
         try:
             # Get report generator and database manager
-            report_generator = self.bot.get_report_generator()
+            report_generator = self.bot.report_generator
             db_manager = self.bot.db_manager
             
             if not report_generator or not db_manager:
@@ -3885,7 +3885,7 @@ class FinanceCog(commands.Cog, name="Finance"):
             pass
         
         # Get report generator
-        report_generator = self.bot.get_report_generator()
+        report_generator = self.bot.report_generator
         if not report_generator:
             await ctx.send("Report generator is not available.")
             return
@@ -4120,7 +4120,7 @@ class FinanceCog(commands.Cog, name="Finance"):
         """
         try:
             # Get report generator
-            report_generator = self.bot.get_report_generator()
+            report_generator = self.bot.report_generator
             if not report_generator:
                 await ctx.send("Report generator is not available.")
                 return
@@ -4279,7 +4279,7 @@ class FinanceCog(commands.Cog, name="Finance"):
         """
         try:
             # Get report generator
-            report_generator = self.bot.get_report_generator()
+            report_generator = self.bot.report_generator
             if not report_generator:
                 await ctx.send("Report generator is not available.")
                 return
@@ -4385,7 +4385,7 @@ class FinanceCog(commands.Cog, name="Finance"):
         """
         try:
             # Get report generator
-            report_generator = self.bot.get_report_generator()
+            report_generator = self.bot.report_generator
             if not report_generator:
                 await ctx.send("Report generator is not available.")
                 return
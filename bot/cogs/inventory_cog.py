@@ -11,6 +11,11 @@ import csv
 import io
 import os
 import asyncio
+import codecs
+import heapq
+import tempfile
+from collections import defaultdict
+from operator import itemgetter
 from typing import Dict, List, Any, Optional, Union
 
 logger = logging.getLogger("accountme_bot.inventory_cog")
@@ -18,6 +23,12 @@ logger = logging.getLogger("accountme_bot.inventory_cog")
 # Valid product categories
 PRODUCT_CATEGORIES = ['blank', 'dtf', 'other']
 
+# Product columns used by the inventory reports
+REPORT_PRODUCT_FIELDS = (
+    'product_id', 'name', 'sku', 'category', 'subcategory',
+    'quantity', 'cost_price', 'selling_price'
+)
+
 # Conversation state for multi-step commands
 class ProductConversation:
     def __init__(self, ctx, category=None):
@@ -51,6 +62,7 @@ class InventoryCog(commands.Cog, name="Inventory"):
     def __init__(self, bot):
         self.bot = bot
         self.active_conversations = {}
+        self.report_tasks = set()
         self.bot.loop.create_task(self._cleanup_conversations())
     
     async def _cleanup_conversations(self):
@@ -2231,7 +2243,7 @@ class InventoryCog(commands.Cog, name="Inventory"):
         db = self.bot.db_manager
         
         # Get products
-        products = db.list_products(category)
+        products = db.list_products(category, fields=REPORT_PRODUCT_FIELDS)
         
         if not products:
             await ctx.send(f"No products found{' in category: ' + category if category else ''}.")
@@ -2256,7 +2268,7 @@ class InventoryCog(commands.Cog, name="Inventory"):
         embed.add_field(name="Out of Stock", value=str(out_of_stock), inline=True)
         
         # Sort products by quantity (descending)
-        products.sort(key=lambda p: p['quantity'], reverse=True)
+        products = sorted(products, key=itemgetter('quantity'), reverse=True)
         
         # Add top products by quantity
         top_products = products[:10]
@@ -2270,22 +2282,27 @@ class InventoryCog(commands.Cog, name="Inventory"):
                 inline=False
             )
         
-        # Generate CSV report
-        report_generator = self.bot.report_generator
-        csv_path, _ = await report_generator.generate_inventory_report(category)
-        
-        # Send embed and file
-        file = discord.File(csv_path, filename=os.path.basename(csv_path))
-        embed.set_footer(text="Full report attached as CSV file")
+        # Send the summary first, then generate the CSV report
+        embed.set_footer(text="Full report will follow as a CSV file")
+        await ctx.send(embed=embed)
         
-        await ctx.send(embed=embed, file=file)
+        self._start_report_task(self._send_stock_report_file(ctx, category))
+    
+    async def _send_stock_report_file(self, ctx, category=None):
+        """Generate the stock levels CSV and upload it as a follow-up message"""
+        try:
+            csv_path, _ = await self.bot.report_generator.generate_inventory_report(category)
+            await ctx.send(file=discord.File(csv_path, filename=os.path.basename(csv_path)))
+        except Exception:
+            logger.exception("Error sending stock levels CSV report")
     
     async def _generate_low_stock_report(self, ctx, threshold=5):
         """Generate a low stock alerts report"""
         db = self.bot.db_manager
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Get all products
-        products = db.list_products()
+        products = db.list_products(fields=REPORT_PRODUCT_FIELDS)
         
         # Filter low stock products
         low_stock = [p for p in products if 0 < p['quantity'] <= threshold]
@@ -2310,7 +2327,7 @@ class InventoryCog(commands.Cog, name="Inventory"):
         # Add low stock products
         if low_stock:
             # Sort by quantity (ascending)
-            low_stock.sort(key=lambda p: p['quantity'])
+            low_stock.sort(key=itemgetter('quantity'))
             
             low_stock_text = "\n".join([
                 f"{p['name']} ({p['sku']}): {p['quantity']}" for p in low_stock[:15]
@@ -2340,40 +2357,27 @@ class InventoryCog(commands.Cog, name="Inventory"):
                 inline=False
             )
         
-        # Export low stock items to CSV
+        # Send the summary first, then export low stock items to CSV
+        if low_stock or out_of_stock:
+            embed.set_footer(text="Full report will follow as a CSV file")
+        await ctx.send(embed=embed)
+        
         if low_stock or out_of_stock:
-            output = io.StringIO()
             fieldnames = [
                 'product_id', 'name', 'sku', 'category', 'quantity',
                 'cost_price', 'selling_price'
             ]
-            
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for product in low_stock + out_of_stock:
-                # Only write the fields we want
-                row = {field: product.get(field) for field in fieldnames}
-                writer.writerow(row)
-            
-            # Create file
-            csv_data = output.getvalue()
-            file = discord.File(
-                io.BytesIO(csv_data.encode('utf-8')),
-                filename=f"low_stock_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            )
-            
-            embed.set_footer(text="Full report attached as CSV file")
-            await ctx.send(embed=embed, file=file)
-        else:
-            await ctx.send(embed=embed)
+            self._start_report_task(self._send_csv_attachment(
+                ctx, fieldnames, low_stock + out_of_stock, f"low_stock_report_{stamp}.csv"
+            ))
     
     async def _generate_value_report(self, ctx, category=None):
         """Generate an inventory value report"""
         db = self.bot.db_manager
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Get products
-        products = db.list_products(category)
+        products = db.list_products(category, fields=REPORT_PRODUCT_FIELDS)
         
         if not products:
             await ctx.send(f"No products found{' in category: ' + category if category else ''}.")
@@ -2386,14 +2390,40 @@ class InventoryCog(commands.Cog, name="Inventory"):
             color=discord.Color.green()
         )
         
-        # Calculate values
-        total_cost_value = sum(p['quantity'] * (p['cost_price'] or 0) for p in products)
-        total_selling_value = sum(p['quantity'] * (p['selling_price'] or 0) for p in products)
+        # Calculate values in a single pass, keeping per-product values for reuse below.
+        # The product dicts come from the manager cache, so they must not be modified.
+        product_values = {}
+        total_cost_value = 0
+        total_selling_value = 0
+        total_items = 0
+        category_values = defaultdict(lambda: {
+            'count': 0,
+            'quantity': 0,
+            'cost_value': 0,
+            'selling_value': 0
+        })
+        for product in products:
+            quantity = product.get('quantity') or 0
+            cost_value = quantity * (product.get('cost_price') or 0)
+            selling_value = quantity * (product.get('selling_price') or 0)
+            product_values[product['product_id']] = (cost_value, selling_value)
+            
+            total_cost_value += cost_value
+            total_selling_value += selling_value
+            total_items += quantity
+            
+            if not category:
+                values = category_values[product['category']]
+                values['count'] += 1
+                values['quantity'] += quantity
+                values['cost_value'] += cost_value
+                values['selling_value'] += selling_value
+        
         potential_profit = total_selling_value - total_cost_value
         
         # Add summary statistics
         embed.add_field(name="Total Products", value=str(len(products)), inline=True)
-        embed.add_field(name="Total Items", value=str(sum(p['quantity'] for p in products)), inline=True)
+        embed.add_field(name="Total Items", value=str(total_items), inline=True)
         embed.add_field(name="Cost Value", value=f"${total_cost_value:.2f}", inline=True)
         embed.add_field(name="Selling Value", value=f"${total_selling_value:.2f}", inline=True)
         embed.add_field(name="Potential Profit", value=f"${potential_profit:.2f}", inline=True)
@@ -2402,25 +2432,8 @@ class InventoryCog(commands.Cog, name="Inventory"):
             margin = (potential_profit / total_cost_value) * 100
             embed.add_field(name="Profit Margin", value=f"{margin:.1f}%", inline=True)
         
-        # Group by category
+        # Add category breakdown
         if not category:
-            category_values = {}
-            for product in products:
-                cat = product['category']
-                if cat not in category_values:
-                    category_values[cat] = {
-                        'count': 0,
-                        'quantity': 0,
-                        'cost_value': 0,
-                        'selling_value': 0
-                    }
-                
-                category_values[cat]['count'] += 1
-                category_values[cat]['quantity'] += product['quantity']
-                category_values[cat]['cost_value'] += product['quantity'] * (product['cost_price'] or 0)
-                category_values[cat]['selling_value'] += product['quantity'] * (product['selling_price'] or 0)
-            
-            # Add category breakdown
             category_text = ""
             for cat, values in category_values.items():
                 profit = values['selling_value'] - values['cost_value']
@@ -2435,11 +2448,11 @@ class InventoryCog(commands.Cog, name="Inventory"):
                 )
         
         # Find most valuable products (by cost)
-        valuable_products = sorted(products, key=lambda p: p['quantity'] * (p['cost_price'] or 0), reverse=True)[:10]
+        valuable_products = heapq.nlargest(10, products, key=lambda p: product_values[p['product_id']][0])
         
         if valuable_products:
             valuable_text = "\n".join([
-                f"{p['name']} ({p['sku']}): ${p['quantity'] * (p['cost_price'] or 0):.2f} ({p['quantity']} × ${p['cost_price'] or 0:.2f})"
+                f"{p['name']} ({p['sku']}): ${product_values[p['product_id']][0]:.2f} ({p['quantity']} × ${p['cost_price'] or 0:.2f})"
                 for p in valuable_products
             ])
             
@@ -2449,66 +2462,51 @@ class InventoryCog(commands.Cog, name="Inventory"):
                 inline=False
             )
         
-        # Export to CSV
-        output = io.StringIO()
+        # Send the summary first, then export to CSV
+        embed.set_footer(text="Full report will follow as a CSV file")
+        await ctx.send(embed=embed)
+        
         fieldnames = [
             'product_id', 'name', 'sku', 'category', 'quantity',
             'cost_price', 'selling_price', 'cost_value', 'selling_value', 'potential_profit'
         ]
         
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for product in products:
-            cost_price = product.get('cost_price') or 0
-            selling_price = product.get('selling_price') or 0
-            quantity = product.get('quantity') or 0
-            
-            cost_value = quantity * cost_price
-            selling_value = quantity * selling_price
-            
-            # Create row with calculated values
-            row = {
+        # Create rows with calculated values
+        rows = (
+            {
                 'product_id': product.get('product_id'),
                 'name': product.get('name'),
                 'sku': product.get('sku'),
                 'category': product.get('category'),
-                'quantity': quantity,
-                'cost_price': cost_price,
-                'selling_price': selling_price,
+                'quantity': product.get('quantity') or 0,
+                'cost_price': product.get('cost_price') or 0,
+                'selling_price': product.get('selling_price') or 0,
                 'cost_value': cost_value,
                 'selling_value': selling_value,
                 'potential_profit': selling_value - cost_value
             }
-            
-            writer.writerow(row)
-        
-        # Create file
-        csv_data = output.getvalue()
-        file = discord.File(
-            io.BytesIO(csv_data.encode('utf-8')),
-            filename=f"inventory_value_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            for product in products
+            for cost_value, selling_value in (product_values[product['product_id']],)
         )
         
-        embed.set_footer(text="Full report attached as CSV file")
-        await ctx.send(embed=embed, file=file)
+        self._start_report_task(self._send_csv_attachment(
+            ctx, fieldnames, rows, f"inventory_value_report_{stamp}.csv"
+        ))
     
     async def _generate_movement_report(self, ctx, days=30):
         """Generate an inventory movement history report"""
         db = self.bot.db_manager
         
-        # Calculate date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # Format dates for query
-        start_date_str = start_date.strftime("%Y-%m-%dT00:00:00")
-        end_date_str = end_date.strftime("%Y-%m-%dT23:59:59")
+        # Calculate date range from a single timestamp so the query bounds and filename agree
+        now = datetime.now()
+        stamp = now.strftime('%Y%m%d_%H%M%S')
+        start_date_str = (now - timedelta(days=days)).strftime("%Y-%m-%d")
+        end_date_str = now.strftime("%Y-%m-%d")
         
         # Get inventory history
         history = db.get_inventory_history(
-            start_date=start_date.strftime("%Y-%m-%d"),
-            end_date=end_date.strftime("%Y-%m-%d")
+            start_date=start_date_str,
+            end_date=end_date_str
         )
         
         if not history:
@@ -2518,7 +2516,7 @@ class InventoryCog(commands.Cog, name="Inventory"):
         # Create embed
         embed = discord.Embed(
             title="Inventory Movement Report",
-            description=f"Changes in the last {days} days ({start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')})",
+            description=f"Changes in the last {days} days ({start_date_str} to {end_date_str})",
             color=discord.Color.blue()
         )
         
@@ -2538,27 +2536,25 @@ class InventoryCog(commands.Cog, name="Inventory"):
         # Group by product
         product_movements = {}
         for entry in history:
-            product_id = entry['product_id']
-            if product_id not in product_movements:
-                product_movements[product_id] = {
-                    'name': entry['product_name'],
-                    'sku': entry['sku'],
-                    'category': entry['category'],
-                    'increases': 0,
-                    'decreases': 0,
-                    'net_change': 0,
-                    'changes': []
-                }
+            movement = product_movements.setdefault(entry['product_id'], {
+                'name': entry['product_name'],
+                'sku': entry['sku'],
+                'category': entry['category'],
+                'increases': 0,
+                'decreases': 0,
+                'net_change': 0,
+                'changes': []
+            })
             
             change = entry['change_amount']
-            product_movements[product_id]['net_change'] += change
+            movement['net_change'] += change
             
             if change > 0:
-                product_movements[product_id]['increases'] += change
+                movement['increases'] += change
             else:
-                product_movements[product_id]['decreases'] += abs(change)
+                movement['decreases'] += abs(change)
             
-            product_movements[product_id]['changes'].append(entry)
+            movement['changes'].append(entry)
         
         # Find most active products
         most_active = sorted(
@@ -2599,7 +2595,7 @@ class InventoryCog(commands.Cog, name="Inventory"):
             )
         
         # Recent activity
-        recent_history = sorted(history, key=lambda h: h['timestamp'], reverse=True)[:10]
+        recent_history = sorted(history, key=itemgetter('timestamp'), reverse=True)[:10]
         
         if recent_history:
             recent_text = ""
@@ -2613,37 +2609,25 @@ class InventoryCog(commands.Cog, name="Inventory"):
                 inline=False
             )
         
-        # Export to CSV
-        output = io.StringIO()
+        # Send the summary first, then export to CSV
+        embed.set_footer(text="Full report will follow as a CSV file")
+        await ctx.send(embed=embed)
+        
         fieldnames = [
             'timestamp', 'product_name', 'sku', 'category',
             'previous_quantity', 'new_quantity', 'change_amount', 'reason'
         ]
-        
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for entry in history:
-            # Create row with selected fields
-            row = {field: entry.get(field) for field in fieldnames}
-            writer.writerow(row)
-        
-        # Create file
-        csv_data = output.getvalue()
-        file = discord.File(
-            io.BytesIO(csv_data.encode('utf-8')),
-            filename=f"inventory_movement_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        )
-        
-        embed.set_footer(text="Full report attached as CSV file")
-        await ctx.send(embed=embed, file=file)
+        self._start_report_task(self._send_csv_attachment(
+            ctx, fieldnames, history, f"inventory_movement_report_{stamp}.csv"
+        ))
     
     async def _generate_category_report(self, ctx):
         """Generate a category breakdown report"""
         db = self.bot.db_manager
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Get all products
-        products = db.list_products()
+        products = db.list_products(fields=REPORT_PRODUCT_FIELDS)
         
         if not products:
             await ctx.send("No products found in the database.")
@@ -2657,12 +2641,9 @@ class InventoryCog(commands.Cog, name="Inventory"):
         )
         
         # Group by category
-        categories = {}
+        categories = defaultdict(list)
         for product in products:
-            category = product['category']
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(product)
+            categories[product['category']].append(product)
         
         # Add summary statistics
         embed.add_field(name="Total Categories", value=str(len(categories)), inline=True)
@@ -2703,12 +2684,9 @@ class InventoryCog(commands.Cog, name="Inventory"):
         
         if subcategory_products:
             # Group by subcategory
-            subcategories = {}
+            subcategories = defaultdict(list)
             for product in subcategory_products:
-                key = f"{product['category']}/{product['subcategory']}"
-                if key not in subcategories:
-                    subcategories[key] = []
-                subcategories[key].append(product)
+                subcategories[f"{product['category']}/{product['subcategory']}"].append(product)
             
             # Create subcategory text
             subcategory_text = ""
@@ -2724,18 +2702,18 @@ class InventoryCog(commands.Cog, name="Inventory"):
                     inline=False
                 )
         
-        # Export to CSV
-        output = io.StringIO()
+        # Send the summary first, then export to CSV
+        embed.set_footer(text="Full report will follow as a CSV file")
+        await ctx.send(embed=embed)
+        
         fieldnames = [
             'category', 'subcategory', 'product_count', 'item_count',
             'in_stock_count', 'out_of_stock_count', 'cost_value',
             'selling_value', 'potential_profit'
         ]
+        rows = []
         
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        # Write category summary rows
+        # Build category summary rows
         for category, category_products in categories.items():
             product_count = len(category_products)
             item_count = sum(p['quantity'] for p in category_products)
@@ -2756,16 +2734,13 @@ class InventoryCog(commands.Cog, name="Inventory"):
                 'potential_profit': selling_value - cost_value
             }
             
-            writer.writerow(row)
+            rows.append(row)
             
-            # Write subcategory rows if applicable
-            subcategories = {}
+            # Build subcategory rows if applicable
+            subcategories = defaultdict(list)
             for product in category_products:
                 if product.get('subcategory'):
-                    subcategory = product['subcategory']
-                    if subcategory not in subcategories:
-                        subcategories[subcategory] = []
-                    subcategories[subcategory].append(product)
+                    subcategories[product['subcategory']].append(product)
             
             for subcategory, subcat_products in subcategories.items():
                 sub_product_count = len(subcat_products)
@@ -2787,17 +2762,48 @@ class InventoryCog(commands.Cog, name="Inventory"):
                     'potential_profit': sub_selling_value - sub_cost_value
                 }
                 
-                writer.writerow(row)
+                rows.append(row)
         
-        # Create file
-        csv_data = output.getvalue()
-        file = discord.File(
-            io.BytesIO(csv_data.encode('utf-8')),
-            filename=f"category_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        )
+        self._start_report_task(self._send_csv_attachment(
+            ctx, fieldnames, rows, f"category_report_{stamp}.csv"
+        ))
+    
+    def _start_report_task(self, coro):
+        """Run a report follow-up in the background, keeping a reference until it finishes"""
+        task = asyncio.create_task(coro)
+        self.report_tasks.add(task)
+        task.add_done_callback(self.report_tasks.discard)
+        return task
+    
+    async def _send_csv_attachment(self, ctx, fieldnames, rows, filename):
+        """Write report rows to a temporary CSV file and upload it as a follow-up message"""
+        try:
+            # Reports can run to thousands of rows, so the file is built off the event loop
+            loop = asyncio.get_running_loop()
+            buffer = await loop.run_in_executor(None, self._write_csv_file, fieldnames, rows)
+            with buffer:
+                await ctx.send(file=discord.File(buffer, filename=filename))
+        except Exception:
+            logger.exception(f"Error sending CSV report {filename}")
+    
+    @staticmethod
+    def _write_csv_file(fieldnames, rows):
+        """Write report rows to a temporary file rewound for reading; called in a worker thread"""
+        buffer = tempfile.TemporaryFile()
+        try:
+            writer = csv.DictWriter(
+                codecs.getwriter('utf-8')(buffer),
+                fieldnames=fieldnames,
+                extrasaction='ignore'
+            )
+            writer.writeheader()
+            writer.writerows(rows)
+        except Exception:
+            buffer.close()
+            raise
         
-        embed.set_footer(text="Full report attached as CSV file")
-        await ctx.send(embed=embed, file=file)
+        buffer.seek(0)
+        return buffer
 
 async def setup(bot):
     """Add the cog to the bot"""
@@ -8,18 +8,132 @@ from discord.ext import commands
 import logging
 import os
 import asyncio
+import io
 import json
 import sqlite3
 import platform
 import psutil
+import threading
 import time
+from collections import deque
+from functools import lru_cache
+from itertools import islice
 from datetime import datetime, timedelta
-import traceback
 import sys
+from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple, Union
 
 logger = logging.getLogger("accountme_bot.system_monitor")
 
+# Components that can be reinitialized during recovery
+try:
+    from utils.image_processor import ImageProcessor
+except ImportError:
+    logger.warning("utils.image_processor could not be imported; image processor recovery disabled")
+    ImageProcessor = None
+
+try:
+    from utils.report_generator import ReportGenerator
+except ImportError:
+    logger.warning("utils.report_generator could not be imported; report generator recovery disabled")
+    ReportGenerator = None
+
+# Seconds between background samples of CPU, memory and disk usage
+RESOURCE_SAMPLE_INTERVAL = 5
+
+# Settings changed through !adminnotify and !healthinterval are saved here
+SYSTEM_MONITOR_CONFIG_PATH = "data/system_monitor.json"
+
+# Seconds between full PRAGMA integrity_check runs; quick_check is used in between
+FULL_INTEGRITY_CHECK_INTERVAL = 86400
+
+# Seconds for which a health check result is shared by overlapping callers
+HEALTH_TTL = 5.0
+
+# Seconds for which !systemstatus reuses the last health check results
+SYSTEM_STATUS_CACHE_SECONDS = 60
+
+# Emoji shown next to each health status; anything else is shown as a failure
+_STATUS_EMOJI = {"healthy": "✅", "warning": "⚠️", "critical": "❌"}
+
+# Health status ordinals, used to reduce check results to the most severe status
+SEVERITY = {"healthy": 0, "warning": 1, "critical": 2}
+SEVERITY_LEVELS = ("healthy", "warning", "critical")
+
+# Timestamp format used in embeds and messages
+TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+# Per-embed budget used when splitting fields, kept under Discord's 6000 character / 25 field
+# limits; each embed is sent as its own message since the character limit covers the whole message
+EMBED_CHAR_BUDGET = 5500
+EMBED_FIELD_BUDGET = 20
+EMBED_FIELD_VALUE_MAX = 1024
+
+# Embed field templates for !systemstatus
+SYS_INFO_TMPL = "**OS:** {system} {release}\n**Python:** {python}\n**Discord.py:** {discord}\n**Uptime:** {uptime}"
+RESOURCE_USAGE_TMPL = "**CPU:** {cpu}%\n**Memory:** {memory}%\n**Disk:** {disk}%"
+
+class RepairConfirmView(discord.ui.View):
+    """Repair/Cancel buttons offered by !databasecheck when issues are found"""
+    
+    def __init__(self, author, timeout: float = 60.0):
+        """
+        Initialize the view
+        
+        Args:
+            author: The only user allowed to press the buttons
+            timeout: Seconds to wait for a choice
+        """
+        super().__init__(timeout=timeout)
+        self.author = author
+        self.confirmed = None
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only let the user who ran the check choose"""
+        if interaction.user != self.author:
+            await interaction.response.send_message("Only the user who ran the check can choose.", ephemeral=True)
+            return False
+        return True
+    
+    async def _choose(self, interaction: discord.Interaction, confirmed: bool):
+        """Record the choice, remove the buttons and stop waiting"""
+        self.confirmed = confirmed
+        await interaction.response.edit_message(view=None)
+        self.stop()
+    
+    @discord.ui.button(label="Repair", style=discord.ButtonStyle.success)
+    async def repair_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._choose(interaction, True)
+    
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger)
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._choose(interaction, False)
+
+@lru_cache(maxsize=64)
+def _pretty_component(name: str) -> str:
+    """Turn a component key like 'image_processor' into 'Image Processor'"""
+    return name.replace('_', ' ').title()
+
+def _env_int(name, default):
+    """
+    Read an integer setting from the environment
+    
+    Args:
+        name: Environment variable name
+        default: Value to use when the variable is unset or not an integer
+        
+    Returns:
+        The parsed integer, or the default
+    """
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("%s is not a valid integer, defaulting to %d", name, default)
+        return default
+
 class SystemMonitorCog(commands.Cog, name="System Monitor"):
     """System monitoring and health check commands"""
     
@@ -27,36 +141,63 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         self.bot = bot
         
         # Load configuration from environment variables
-        try:
-            self.health_check_interval = int(os.getenv("HEALTH_CHECK_INTERVAL_MINUTES", "30"))
-        except ValueError:
-            self.health_check_interval = 30
-            logger.warning("HEALTH_CHECK_INTERVAL_MINUTES is not a valid integer, defaulting to 30")
+        self.health_check_interval = _env_int("HEALTH_CHECK_INTERVAL_MINUTES", 30)
+        self.error_threshold = _env_int("ERROR_THRESHOLD", 5)
+        self.admin_notification_channel_id = _env_int("ADMIN_NOTIFICATION_CHANNEL_ID", 0)
         
-        try:
-            self.error_threshold = int(os.getenv("ERROR_THRESHOLD", "5"))
-        except ValueError:
-            self.error_threshold = 5
-            logger.warning("ERROR_THRESHOLD is not a valid integer, defaulting to 5")
-        
-        try:
-            self.admin_notification_channel_id = int(os.getenv("ADMIN_NOTIFICATION_CHANNEL_ID", "0"))
-        except ValueError:
-            self.admin_notification_channel_id = 0
-            logger.warning("ADMIN_NOTIFICATION_CHANNEL_ID is not a valid integer, defaulting to 0")
+        # Settings changed with !adminnotify / !healthinterval override the environment
+        self._load_config()
         
         # Initialize monitoring data
         self.start_time = datetime.now()
         self.error_count = 0
-        self.error_history = []
+        self.error_history = deque(maxlen=_env_int("ERROR_HISTORY_MAX", 1000))  # oldest first
+        self._error_minute_buckets = deque()  # [minute_epoch, count] for the last hour, oldest first
         self.last_health_check = None
         self.health_check_results = {}
-        self.recovery_attempts = {}
+        self._health_json = None  # health_check_results serialized once per health check
+        
+        # Short-lived memo so bursts of health check requests share one run
+        self._hc_cache = None
+        self._hc_cache_ts = 0.0
+        self._hc_lock = asyncio.Lock()
+        
+        # Static embed skeletons, copied and filled in per command
+        self._health_embed_template = discord.Embed(title="Health Check Results")
+        self._status_embed_template = discord.Embed(title="System Status")
+        
+        # Only one !databasecheck scan and one !healthcheck run at a time
+        self._db_check_lock = asyncio.Lock()
+        self._health_lock = asyncio.Lock()
+        self.recovery_attempts = {}  # component -> time.monotonic() of last recovery attempt
+        self._last_full_integrity = 0
+        
+        # Read-only connection used only by the database health probes, kept apart from
+        # the bot's db_manager connection so long scans never contend with user-facing writes
+        self._health_conn = None
+        self._health_conn_lock = threading.Lock()
+        
+        # Directory holding the database, used for disk usage; DATABASE_PATH does not change at runtime
+        self._db_dir = os.path.dirname(os.path.abspath(os.getenv("DATABASE_PATH", "data/database.db")))
+        
+        # Sample system resources on a background thread so health checks never block the event loop
+        self._resource_snapshot = {}
+        self._resource_lock = threading.Lock()
+        self._sampler_stop = threading.Event()
+        self._sampler_thread = threading.Thread(
+            target=self._sample_system_resources,
+            name="system-resource-sampler",
+            daemon=True
+        )
+        self._sampler_thread.start()
+        
+        # Set on unload so the scheduled health check wakes up and exits immediately
+        self._stop = asyncio.Event()
         
         # Start health check task
         if self.health_check_interval > 0:
             self.health_check_task = self.bot.loop.create_task(self._scheduled_health_check())
-            logger.info(f"Scheduled health check task started with interval of {self.health_check_interval} minutes")
+            logger.info("Scheduled health check task started with interval of %d minutes", self.health_check_interval)
         
         # Register error handler
         self.bot.add_listener(self.on_command_error, "on_command_error")
@@ -66,6 +207,12 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
     
     def cog_unload(self):
         """Called when the cog is unloaded"""
+        self._sampler_stop.set()
+        self._stop.set()
+        
+        with self._health_conn_lock:
+            self._close_health_connection()
+        
         if hasattr(self, 'health_check_task'):
             self.health_check_task.cancel()
             logger.info("Scheduled health check task cancelled")
@@ -76,29 +223,28 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             # Wait for bot to be ready
             await self.bot.wait_until_ready()
             
-            while not self.bot.is_closed():
+            while not self.bot.is_closed() and not self._stop.is_set():
                 try:
                     # Perform health check
                     logger.info("Running scheduled health check")
-                    await self._perform_health_check()
-                    
-                    # Update last health check time
-                    self.last_health_check = datetime.now()
+                    await self._perform_health_check(force=True)
                     
-                except Exception as e:
-                    logger.error(f"Error in scheduled health check: {str(e)}")
-                    logger.error(traceback.format_exc())
+                except Exception:
+                    logger.error("Error in scheduled health check", exc_info=True)
                 
-                # Wait for next health check interval
-                await asyncio.sleep(self.health_check_interval * 60)  # Convert minutes to seconds
+                # Wait for next health check interval, or until the cog is unloaded
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=self.health_check_interval * 60)
+                    break
+                except asyncio.TimeoutError:
+                    pass
         
         except asyncio.CancelledError:
             logger.info("Scheduled health check task cancelled")
-        except Exception as e:
-            logger.error(f"Unexpected error in health check task: {str(e)}")
-            logger.error(traceback.format_exc())
+        except Exception:
+            logger.error("Unexpected error in health check task", exc_info=True)
     
-    async def _perform_health_check(self):
+    async def _perform_health_check(self, force: bool = False):
         """
         Perform a comprehensive health check of the system
         
@@ -108,44 +254,68 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         3. Discord connection status
         4. Error rate
         5. Component status (image processor, report generator, etc.)
+        
+        Concurrent callers are serialized so overlapping requests share one run, and
+        results younger than HEALTH_TTL seconds are returned as-is.
+        
+        Args:
+            force: Run the checks even if recent results are cached
+            
+        Returns:
+            Health check results
         """
+        async with self._hc_lock:
+            if not force and self._hc_cache is not None and time.monotonic() - self._hc_cache_ts < HEALTH_TTL:
+                return self._hc_cache
+            
+            health_results = await self._run_health_check()
+            self._hc_cache = health_results
+            self._hc_cache_ts = time.monotonic()
+            return health_results
+    
+    async def _run_health_check(self):
+        """Run every health check, then store, recover and notify based on the results"""
+        now = datetime.now()
         health_results = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "status": "healthy",  # Will be set to "warning" or "critical" if issues are found
             "checks": {}
         }
         
-        # Check system resources
-        system_status = await self._check_system_resources()
-        health_results["checks"]["system"] = system_status
-        
-        # Check database integrity
-        db_status = await self._check_database_integrity()
-        health_results["checks"]["database"] = db_status
-        
-        # Check Discord connection
-        discord_status = await self._check_discord_connection()
-        health_results["checks"]["discord"] = discord_status
-        
-        # Check error rate
-        error_status = await self._check_error_rate()
-        health_results["checks"]["errors"] = error_status
-        
-        # Check component status
-        component_status = await self._check_component_status()
-        health_results["checks"]["components"] = component_status
+        # Run the independent checks concurrently
+        check_names = ("system", "database", "discord", "errors", "components")
+        check_results = await asyncio.gather(
+            self._check_system_resources(),
+            self._check_database_integrity(),
+            self._check_discord_connection(),
+            self._check_error_rate(now),
+            self._check_component_status(),
+            return_exceptions=True
+        )
         
-        # Determine overall status
-        if any(check.get("status") == "critical" for check in health_results["checks"].values()):
-            health_results["status"] = "critical"
-        elif any(check.get("status") == "warning" for check in health_results["checks"].values()):
-            health_results["status"] = "warning"
+        for check_name, result in zip(check_names, check_results):
+            if isinstance(result, Exception):
+                logger.error("Error running %s health check: %s", check_name, result)
+                result = {
+                    "status": "warning",
+                    "error": str(result),
+                    "warnings": [f"Failed to run {check_name} check"]
+                }
+            health_results["checks"][check_name] = result
+        
+        # Determine overall status as the most severe check status
+        severity = max(
+            SEVERITY.get(check.get("status"), 0) for check in health_results["checks"].values()
+        )
+        health_results["status"] = SEVERITY_LEVELS[severity]
         
-        # Store health check results
+        # Store health check results, along with their JSON form for !systemstatus json
         self.health_check_results = health_results
+        self._health_json = json.dumps(health_results, default=str)
+        self.last_health_check = now
         
         # Log health check results
-        logger.info(f"Health check completed with status: {health_results['status']}")
+        logger.info("Health check completed with status: %s", health_results['status'])
         
         # Attempt recovery for any critical issues
         if health_results["status"] in ["warning", "critical"]:
@@ -153,25 +323,51 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         
         # Send notification if there are issues
         if health_results["status"] in ["warning", "critical"]:
-            await self._send_admin_notification(health_results)
+            await self._send_admin_notification(health_results, now)
         
         return health_results
     
+    def _sample_system_resources(self):
+        """Background thread that keeps a snapshot of CPU, memory and disk usage"""
+        # The first non-blocking CPU reading has no reference point, so prime it
+        psutil.cpu_percent(interval=None)
+        
+        while not self._sampler_stop.wait(RESOURCE_SAMPLE_INTERVAL):
+            try:
+                snapshot = {
+                    "cpu_percent": psutil.cpu_percent(interval=None),
+                    "memory_percent": psutil.virtual_memory().percent,
+                    "disk_percent": psutil.disk_usage(self._db_dir).percent
+                }
+            except Exception as e:
+                logger.error("Error sampling system resources: %s", e)
+                snapshot = {"error": str(e)}
+            
+            with self._resource_lock:
+                self._resource_snapshot = snapshot
+    
     async def _check_system_resources(self) -> Dict[str, Any]:
-        """Check system resources (CPU, memory, disk)"""
+        """Check system resources (CPU, memory, disk) from the latest background sample"""
         try:
-            # Get CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            
-            # Get memory usage
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            
-            # Get disk usage for the database directory
-            db_path = os.getenv("DATABASE_PATH", "data/database.db")
-            db_dir = os.path.dirname(os.path.abspath(db_path))
-            disk = psutil.disk_usage(db_dir)
-            disk_percent = disk.percent
+            with self._resource_lock:
+                snapshot = self._resource_snapshot
+            
+            # Nothing to report until the sampler has taken its first reading
+            if not snapshot:
+                return {
+                    "status": "healthy",
+                    "cpu_percent": "N/A",
+                    "memory_percent": "N/A",
+                    "disk_percent": "N/A",
+                    "warnings": []
+                }
+            
+            if "error" in snapshot:
+                raise RuntimeError(snapshot["error"])
+            
+            cpu_percent = snapshot["cpu_percent"]
+            memory_percent = snapshot["memory_percent"]
+            disk_percent = snapshot["disk_percent"]
             
             # Determine status based on thresholds
             status = "healthy"
@@ -207,32 +403,139 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             }
         
         except Exception as e:
-            logger.error(f"Error checking system resources: {str(e)}")
+            logger.error("Error checking system resources: %s", e)
             return {
                 "status": "warning",
                 "error": str(e),
                 "warnings": ["Failed to check system resources"]
             }
     
+    def _get_health_connection(self, db_path: str) -> sqlite3.Connection:
+        """
+        Get the read-only connection used for health checks, opening it on first use
+        
+        Callers must hold self._health_conn_lock.
+        """
+        if self._health_conn is None:
+            db_uri = Path(os.path.abspath(db_path)).as_uri() + "?mode=ro"
+            self._health_conn = sqlite3.connect(db_uri, uri=True, check_same_thread=False)
+            # Keep a large page cache warm between probes and sort in memory
+            self._health_conn.execute("PRAGMA cache_size = -64000")
+            self._health_conn.execute("PRAGMA temp_store = MEMORY")
+        
+        return self._health_conn
+    
+    def _close_health_connection(self):
+        """
+        Close the health check connection so the next probe reopens it
+        
+        Callers must hold self._health_conn_lock.
+        """
+        if self._health_conn is not None:
+            self._health_conn.close()
+            self._health_conn = None
+    
+    def _sync_integrity_check(self, db_path: str, full: bool = True) -> Tuple[str, List[Any], os.stat_result]:
+        """
+        Run the blocking SQLite integrity checks; called from a worker thread
+        
+        Args:
+            db_path: Path to the database file
+            full: Run PRAGMA integrity_check instead of the cheaper quick_check
+            
+        Returns:
+            Tuple of (integrity result, foreign key violations, database file stat)
+        """
+        with self._health_conn_lock:
+            try:
+                cursor = self._get_health_connection(db_path).cursor()
+                
+                # Run integrity check
+                cursor.execute("PRAGMA integrity_check" if full else "PRAGMA quick_check")
+                integrity_result = cursor.fetchone()[0]
+                
+                # Run foreign key check
+                cursor.execute("PRAGMA foreign_key_check")
+                foreign_key_result = cursor.fetchall()
+            except sqlite3.Error:
+                # Drop the connection so the next check reopens it
+                self._close_health_connection()
+                raise
+        
+        return integrity_result, foreign_key_result, os.stat(db_path)
+    
+    def _run_integrity_probe(self, db_path: str) -> Dict[str, Any]:
+        """
+        Run the full !databasecheck scan; called from a worker thread
+        
+        Args:
+            db_path: Path to the database file
+            
+        Returns:
+            Dictionary with the integrity result, foreign key violations, row count per table
+            and the database file stat
+        """
+        with self._health_conn_lock:
+            try:
+                cursor = self._get_health_connection(db_path).cursor()
+                
+                # Run integrity check
+                cursor.execute("PRAGMA integrity_check")
+                integrity_result = cursor.fetchone()[0]
+                
+                # Run foreign key check
+                cursor.execute("PRAGMA foreign_key_check")
+                foreign_key_result = cursor.fetchall()
+                
+                # Get table information
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                tables = [row[0] for row in cursor.fetchall() if not row[0].startswith('sqlite_')]
+                
+                # Get table statistics in a single round-trip
+                table_stats = {}
+                if tables:
+                    sql = " UNION ALL ".join(
+                        "SELECT {name} AS name, COUNT(*) AS count FROM {table}".format(
+                            name="'" + table.replace("'", "''") + "'",
+                            table='"' + table.replace('"', '""') + '"'
+                        )
+                        for table in tables
+                    )
+                    cursor.execute(sql)
+                    table_stats = dict(cursor.fetchall())
+            except sqlite3.Error:
+                # Drop the connection so the next check reopens it
+                self._close_health_connection()
+                raise
+        
+        return {
+            "integrity_result": integrity_result,
+            "foreign_key_result": foreign_key_result,
+            "table_stats": table_stats,
+            "db_stat": os.stat(db_path)
+        }
+    
     async def _check_database_integrity(self) -> Dict[str, Any]:
         """Check database integrity"""
         try:
             db_path = os.getenv("DATABASE_PATH", "data/database.db")
             
-            # Create a new connection for integrity check
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Run integrity check
-            cursor.execute("PRAGMA integrity_check")
-            integrity_result = cursor.fetchone()[0]
+            # Run the integrity scan off the event loop; the full scan only runs once a day
+            loop = asyncio.get_running_loop()
+            full = time.time() - self._last_full_integrity >= FULL_INTEGRITY_CHECK_INTERVAL
+            integrity_result, foreign_key_result, db_stat = await loop.run_in_executor(
+                None, self._sync_integrity_check, db_path, full
+            )
             
-            # Run foreign key check
-            cursor.execute("PRAGMA foreign_key_check")
-            foreign_key_result = cursor.fetchall()
+            # Escalate to a full scan if the quick check found problems
+            if not full and integrity_result != "ok":
+                full = True
+                integrity_result, foreign_key_result, db_stat = await loop.run_in_executor(
+                    None, self._sync_integrity_check, db_path, full
+                )
             
-            # Close connection
-            conn.close()
+            if full:
+                self._last_full_integrity = time.time()
             
             # Determine status based on results
             status = "healthy"
@@ -247,8 +550,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
                 warnings.append(f"Foreign key constraints violated: {len(foreign_key_result)} violations")
             
             # Check database size
-            db_size = os.path.getsize(db_path)
-            db_size_mb = db_size / (1024 * 1024)
+            db_size_mb = db_stat.st_size / (1024 * 1024)
             
             if db_size_mb > 100:
                 status = "warning"
@@ -259,11 +561,12 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
                 "integrity_result": integrity_result,
                 "foreign_key_violations": len(foreign_key_result),
                 "db_size_mb": db_size_mb,
+                "db_modified": datetime.fromtimestamp(db_stat.st_mtime).isoformat(),
                 "warnings": warnings
             }
         
         except Exception as e:
-            logger.error(f"Error checking database integrity: {str(e)}")
+            logger.error("Error checking database integrity: %s", e)
             return {
                 "status": "warning",
                 "error": str(e),
@@ -309,18 +612,18 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             }
         
         except Exception as e:
-            logger.error(f"Error checking Discord connection: {str(e)}")
+            logger.error("Error checking Discord connection: %s", e)
             return {
                 "status": "warning",
                 "error": str(e),
                 "warnings": ["Failed to check Discord connection"]
             }
     
-    async def _check_error_rate(self) -> Dict[str, Any]:
-        """Check error rate"""
+    async def _check_error_rate(self, now: datetime) -> Dict[str, Any]:
+        """Check error rate as of the health check time"""
         try:
             # Calculate error rate (errors per hour)
-            uptime_hours = (datetime.now() - self.start_time).total_seconds() / 3600
+            uptime_hours = (now - self.start_time).total_seconds() / 3600
             error_rate = self.error_count / max(uptime_hours, 1)
             
             # Determine status based on results
@@ -335,21 +638,21 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
                 warnings.append(f"Error rate is high: {error_rate:.2f} errors per hour")
             
             # Check recent errors
-            recent_errors = [e for e in self.error_history if e["timestamp"] > datetime.now() - timedelta(hours=1)]
-            if len(recent_errors) > self.error_threshold:
+            recent_errors = self.recent_errors_last_hour(now.timestamp())
+            if recent_errors > self.error_threshold:
                 status = "critical"
-                warnings.append(f"Many recent errors: {len(recent_errors)} in the last hour")
+                warnings.append(f"Many recent errors: {recent_errors} in the last hour")
             
             return {
                 "status": status,
                 "error_count": self.error_count,
                 "error_rate": error_rate,
-                "recent_errors": len(recent_errors),
+                "recent_errors": recent_errors,
                 "warnings": warnings
             }
         
         except Exception as e:
-            logger.error(f"Error checking error rate: {str(e)}")
+            logger.error("Error checking error rate: %s", e)
             return {
                 "status": "warning",
                 "error": str(e),
@@ -364,46 +667,38 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             overall_status = "healthy"
             
             # Check database manager
-            try:
-                # Simple query to test database connection
-                self.bot.db_manager.execute_query("SELECT 1")
-                components["database_manager"] = "healthy"
-            except Exception as e:
+            db_manager = getattr(self.bot, 'db_manager', None)
+            if db_manager is None:
                 components["database_manager"] = "critical"
-                warnings.append(f"Database manager is not functioning: {str(e)}")
+                warnings.append("Database manager is not initialized")
                 overall_status = "critical"
+            else:
+                try:
+                    # Simple query to test database connection
+                    db_manager.execute_query("SELECT 1")
+                    components["database_manager"] = "healthy"
+                except Exception as e:
+                    components["database_manager"] = "critical"
+                    warnings.append(f"Database manager is not functioning: {str(e)}")
+                    overall_status = "critical"
             
             # Check image processor
-            try:
-                # Check if image processor is initialized
-                if self.bot.get_image_processor() is None:
-                    components["image_processor"] = "warning"
-                    warnings.append("Image processor is not initialized")
-                    if overall_status == "healthy":
-                        overall_status = "warning"
-                else:
-                    components["image_processor"] = "healthy"
-            except Exception as e:
+            if getattr(self.bot, 'image_processor', None) is None:
                 components["image_processor"] = "warning"
-                warnings.append(f"Error checking image processor: {str(e)}")
+                warnings.append("Image processor is not initialized")
                 if overall_status == "healthy":
                     overall_status = "warning"
+            else:
+                components["image_processor"] = "healthy"
             
             # Check report generator
-            try:
-                # Check if report generator is initialized
-                if self.bot.report_generator is None:
-                    components["report_generator"] = "warning"
-                    warnings.append("Report generator is not initialized")
-                    if overall_status == "healthy":
-                        overall_status = "warning"
-                else:
-                    components["report_generator"] = "healthy"
-            except Exception as e:
+            if getattr(self.bot, 'report_generator', None) is None:
                 components["report_generator"] = "warning"
-                warnings.append(f"Error checking report generator: {str(e)}")
+                warnings.append("Report generator is not initialized")
                 if overall_status == "healthy":
                     overall_status = "warning"
+            else:
+                components["report_generator"] = "healthy"
             
             return {
                 "status": overall_status,
@@ -412,7 +707,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             }
         
         except Exception as e:
-            logger.error(f"Error checking component status: {str(e)}")
+            logger.error("Error checking component status: %s", e)
             return {
                 "status": "warning",
                 "error": str(e),
@@ -447,12 +742,12 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             
             # Log recovery actions
             if recovery_actions:
-                logger.info(f"Recovery actions performed: {', '.join(recovery_actions)}")
+                logger.info("Recovery actions performed: %s", ', '.join(recovery_actions))
             
             return recovery_actions
         
         except Exception as e:
-            logger.error(f"Error attempting recovery: {str(e)}")
+            logger.error("Error attempting recovery: %s", e)
             return []
     
     async def _recover_database(self) -> bool:
@@ -460,17 +755,19 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         try:
             # Check if we've attempted recovery recently
             last_attempt = self.recovery_attempts.get("database")
-            if last_attempt and (datetime.now() - last_attempt).total_seconds() < 3600:
+            if last_attempt is not None and time.monotonic() - last_attempt < 3600:
                 logger.info("Skipping database recovery - attempted recently")
                 return False
             
             logger.info("Attempting database recovery")
             
             # Record recovery attempt
-            self.recovery_attempts["database"] = datetime.now()
+            self.recovery_attempts["database"] = time.monotonic()
             
-            # Close existing connection
+            # Close existing connections; the health probes reopen theirs on next use
             self.bot.db_manager.close()
+            with self._health_conn_lock:
+                self._close_health_connection()
             
             # Reopen connection
             db_path = os.getenv("DATABASE_PATH", "data/database.db")
@@ -487,7 +784,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             return True
         
         except Exception as e:
-            logger.error(f"Error recovering database: {str(e)}")
+            logger.error("Error recovering database: %s", e)
             return False
     
     async def _recover_discord_connection(self) -> bool:
@@ -495,14 +792,14 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         try:
             # Check if we've attempted recovery recently
             last_attempt = self.recovery_attempts.get("discord")
-            if last_attempt and (datetime.now() - last_attempt).total_seconds() < 300:
+            if last_attempt is not None and time.monotonic() - last_attempt < 300:
                 logger.info("Skipping Discord reconnection - attempted recently")
                 return False
             
             logger.info("Attempting Discord reconnection")
             
             # Record recovery attempt
-            self.recovery_attempts["discord"] = datetime.now()
+            self.recovery_attempts["discord"] = time.monotonic()
             
             # We can't directly reconnect, but we can log the issue
             # In a production environment, this would trigger a restart mechanism
@@ -511,7 +808,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             return False
         
         except Exception as e:
-            logger.error(f"Error recovering Discord connection: {str(e)}")
+            logger.error("Error recovering Discord connection: %s", e)
             return False
     
     async def _recover_components(self) -> bool:
@@ -519,28 +816,26 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         try:
             # Check if we've attempted recovery recently
             last_attempt = self.recovery_attempts.get("components")
-            if last_attempt and (datetime.now() - last_attempt).total_seconds() < 1800:
+            if last_attempt is not None and time.monotonic() - last_attempt < 1800:
                 logger.info("Skipping component recovery - attempted recently")
                 return False
             
             logger.info("Attempting component recovery")
             
             # Record recovery attempt
-            self.recovery_attempts["components"] = datetime.now()
+            self.recovery_attempts["components"] = time.monotonic()
             
             # Reinitialize components as needed
             components_reinitialized = False
             
             # Check image processor
-            if self.bot.get_image_processor() is None:
-                from utils.image_processor import ImageProcessor
+            if getattr(self.bot, 'image_processor', None) is None and ImageProcessor is not None:
                 self.bot.image_processor = ImageProcessor()
                 logger.info("Reinitialized image processor")
                 components_reinitialized = True
             
             # Check report generator
-            if self.bot.report_generator is None:
-                from utils.report_generator import ReportGenerator
+            if self.bot.report_generator is None and ReportGenerator is not None:
                 reports_dir = os.getenv("REPORTS_DIR", "data/reports")
                 reports_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), reports_dir)
                 os.makedirs(reports_path, exist_ok=True)
@@ -551,12 +846,17 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             return components_reinitialized
         
         except Exception as e:
-            logger.error(f"Error recovering components: {str(e)}")
+            logger.error("Error recovering components: %s", e)
             return False
     
-    async def _send_admin_notification(self, health_results: Dict[str, Any]):
+    async def _send_admin_notification(self, health_results: Dict[str, Any], now: datetime):
         """Send notification to admins about system issues"""
         try:
+            # Nothing can be delivered once the Discord connection is closed
+            if self.bot.is_closed():
+                logger.warning("Skipping admin notification - Discord connection is closed")
+                return
+            
             # Check if admin notification channel is configured
             if not self.admin_notification_channel_id:
                 logger.warning("Admin notification channel not configured")
@@ -565,13 +865,13 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             # Get the notification channel
             channel = self.bot.get_channel(self.admin_notification_channel_id)
             if not channel:
-                logger.warning(f"Admin notification channel not found: {self.admin_notification_channel_id}")
+                logger.warning("Admin notification channel not found: %s", self.admin_notification_channel_id)
                 return
             
             # Create notification embed
             embed = discord.Embed(
                 title=f"System Health Alert: {health_results['status'].upper()}",
-                description=f"Health check at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} detected issues",
+                description=f"Health check at {now.strftime(TS_FMT)} detected issues",
                 color=discord.Color.red() if health_results["status"] == "critical" else discord.Color.gold()
             )
             
@@ -580,7 +880,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
                 if check_data.get("warnings"):
                     embed.add_field(
                         name=f"{check_name.capitalize()} Issues",
-                        value="\n".join(f"• {warning}" for warning in check_data["warnings"]),
+                        value="• " + "\n• ".join(check_data["warnings"]),
                         inline=False
                     )
             
@@ -588,7 +888,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             if hasattr(self, 'last_recovery_actions') and self.last_recovery_actions:
                 embed.add_field(
                     name="Recovery Actions",
-                    value="\n".join(f"• {action}" for action in self.last_recovery_actions),
+                    value="• " + "\n• ".join(self.last_recovery_actions),
                     inline=False
                 )
             
@@ -601,10 +901,40 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             
             # Send notification
             await channel.send(embed=embed)
-            logger.info(f"Sent admin notification about {health_results['status']} status")
+            logger.info("Sent admin notification about %s status", health_results['status'])
         
         except Exception as e:
-            logger.error(f"Error sending admin notification: {str(e)}")
+            logger.error("Error sending admin notification: %s", e)
+    
+    def _prune_error_buckets(self, minute: int):
+        """Drop per-minute error buckets that are more than an hour old"""
+        cutoff = minute - 60
+        buckets = self._error_minute_buckets
+        while buckets and buckets[0][0] <= cutoff:
+            buckets.popleft()
+    
+    def _record_error_bucket(self):
+        """Count an error in the bucket for the current minute"""
+        minute = int(time.time() // 60)
+        self._prune_error_buckets(minute)
+        if self._error_minute_buckets and self._error_minute_buckets[-1][0] == minute:
+            self._error_minute_buckets[-1][1] += 1
+        else:
+            self._error_minute_buckets.append([minute, 1])
+    
+    def recent_errors_last_hour(self, timestamp: Optional[float] = None) -> int:
+        """
+        Count errors recorded in the hour before the given time
+        
+        Args:
+            timestamp: POSIX timestamp to count back from (defaults to now)
+            
+        Returns:
+            Number of errors in the last 60 one-minute buckets
+        """
+        minute = int((time.time() if timestamp is None else timestamp) // 60)
+        self._prune_error_buckets(minute)
+        return sum(count for _, count in self._error_minute_buckets)
     
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
@@ -626,7 +956,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         # Get the original error if it's wrapped
         error = getattr(error, 'original', error)
         
-        # Add to error history (keep last 100 errors)
+        # Add to error history; the deque keeps the newest ERROR_HISTORY_MAX entries
         error_info = {
             "timestamp": datetime.now(),
             "command": ctx.command.qualified_name if ctx.command else "Unknown",
@@ -635,11 +965,10 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         }
         
         self.error_history.append(error_info)
-        if len(self.error_history) > 100:
-            self.error_history.pop(0)
+        self._record_error_bucket()
         
         # Log the error
-        logger.error(f"Command error in {error_info['command']}: {error_info['error_type']}: {error_info['error_message']}")
+        logger.error("Command error in %s: %s: %s", error_info['command'], error_info['error_type'], error_info['error_message'])
     
     @commands.Cog.listener()
     async def on_error(self, event, *args, **kwargs):
@@ -653,7 +982,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         # Get the error information
         error_type, error, error_traceback = sys.exc_info()
         
-        # Add to error history (keep last 100 errors)
+        # Add to error history; the deque keeps the newest ERROR_HISTORY_MAX entries
         error_info = {
             "timestamp": datetime.now(),
             "event": event,
@@ -662,106 +991,133 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         }
         
         self.error_history.append(error_info)
-        if len(self.error_history) > 100:
-            self.error_history.pop(0)
+        self._record_error_bucket()
         
         # Log the error
-        logger.error(f"Event error in {error_info['event']}: {error_info['error_type']}: {error_info['error_message']}")
+        logger.error("Event error in %s: %s: %s", error_info['event'], error_info['error_type'], error_info['error_message'])
     
     @commands.command(name="systemstatus")
     @commands.has_permissions(administrator=True)
-    async def system_status_command(self, ctx):
+    async def system_status_command(self, ctx, mode: str = None):
         """
         Show detailed system status information
         
         Usage:
         !systemstatus - Show system status and health information
+        !systemstatus force - Run a fresh health check instead of reusing recent results
+        !systemstatus json - Show the raw health check results as JSON
         """
-        # Perform a health check
-        health_results = await self._perform_health_check()
+        # Reuse the last health check if it is recent enough
+        cache_age = None
+        if self.last_health_check and self.health_check_results:
+            cache_age = (datetime.now() - self.last_health_check).total_seconds()
+        
+        if mode == "force" or cache_age is None or cache_age >= SYSTEM_STATUS_CACHE_SECONDS:
+            previous_check = self.last_health_check
+            health_results = await self._perform_health_check(force=mode == "force")
+            # Fresh results need no age note; only results reused within HEALTH_TTL get one
+            if self.last_health_check != previous_check:
+                cache_age = None
+            else:
+                cache_age = (datetime.now() - self.last_health_check).total_seconds()
+        else:
+            health_results = self.health_check_results
         
-        # Create status embed
-        embed = discord.Embed(
-            title="System Status",
-            description=f"Status as of {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            color=discord.Color.green() if health_results["status"] == "healthy" else 
-                  discord.Color.gold() if health_results["status"] == "warning" else
-                  discord.Color.red()
-        )
+        # Return the JSON serialized when the health check ran
+        if mode == "json":
+            if len(self._health_json) <= 1980:
+                await ctx.send(f"```json\n{self._health_json}\n```")
+            else:
+                await ctx.send(file=discord.File(io.BytesIO(self._health_json.encode('utf-8')), filename="health_check.json"))
+            return
+        
+        description = f"Status as of {datetime.now().strftime(TS_FMT)}"
+        color = (discord.Color.green() if health_results["status"] == "healthy" else
+                 discord.Color.gold() if health_results["status"] == "warning" else
+                 discord.Color.red())
+        
+        # Collect fields first so they can be split across embeds
+        fields = []
         
         # Add system information
         system_info = platform.uname()
-        embed.add_field(
-            name="System Information",
-            value=f"**OS:** {system_info.system} {system_info.release}\n"
-                  f"**Python:** {platform.python_version()}\n"
-                  f"**Discord.py:** {discord.__version__}\n"
-                  f"**Uptime:** {self._format_timedelta(datetime.now() - self.start_time)}",
-            inline=False
-        )
+        fields.append((
+            "System Information",
+            SYS_INFO_TMPL.format(
+                system=system_info.system,
+                release=system_info.release,
+                python=platform.python_version(),
+                discord=discord.__version__,
+                uptime=self._format_timedelta(datetime.now() - self.start_time)
+            ),
+            False
+        ))
         
         # Add resource usage
         system_status = health_results["checks"].get("system", {})
-        embed.add_field(
-            name="Resource Usage",
-            value=f"**CPU:** {system_status.get('cpu_percent', 'N/A')}%\n"
-                  f"**Memory:** {system_status.get('memory_percent', 'N/A')}%\n"
-                  f"**Disk:** {system_status.get('disk_percent', 'N/A')}%",
-            inline=True
-        )
+        fields.append((
+            "Resource Usage",
+            RESOURCE_USAGE_TMPL.format(
+                cpu=system_status.get('cpu_percent', 'N/A'),
+                memory=system_status.get('memory_percent', 'N/A'),
+                disk=system_status.get('disk_percent', 'N/A')
+            ),
+            True
+        ))
         
         # Add database status
         db_status = health_results["checks"].get("database", {})
-        embed.add_field(
-            name="Database Status",
-            value=f"**Integrity:** {db_status.get('integrity_result', 'N/A')}\n"
-                  f"**FK Violations:** {db_status.get('foreign_key_violations', 'N/A')}\n"
-                  f"**Size:** {db_status.get('db_size_mb', 'N/A'):.2f} MB",
-            inline=True
-        )
+        fields.append((
+            "Database Status",
+            f"**Integrity:** {db_status.get('integrity_result', 'N/A')}\n"
+            f"**FK Violations:** {db_status.get('foreign_key_violations', 'N/A')}\n"
+            f"**Size:** {db_status.get('db_size_mb', 'N/A'):.2f} MB",
+            True
+        ))
         
         # Add Discord status
         discord_status = health_results["checks"].get("discord", {})
-        embed.add_field(
-            name="Discord Status",
-            value=f"**Connected:** {'Yes' if discord_status.get('connected', False) else 'No'}\n"
-                  f"**Latency:** {discord_status.get('latency', 'N/A'):.2f}s\n"
-                  f"**Guilds:** {discord_status.get('guild_count', 'N/A')}",
-            inline=True
-        )
+        fields.append((
+            "Discord Status",
+            f"**Connected:** {'Yes' if discord_status.get('connected', False) else 'No'}\n"
+            f"**Latency:** {discord_status.get('latency', 'N/A'):.2f}s\n"
+            f"**Guilds:** {discord_status.get('guild_count', 'N/A')}",
+            True
+        ))
         
         # Add error statistics
         error_status = health_results["checks"].get("errors", {})
-        embed.add_field(
-            name="Error Statistics",
-            value=f"**Total Errors:** {error_status.get('error_count', 'N/A')}\n"
-                  f"**Error Rate:** {error_status.get('error_rate', 'N/A'):.2f}/hour\n"
-                  f"**Recent Errors:** {error_status.get('recent_errors', 'N/A')} (last hour)",
-            inline=True
-        )
+        fields.append((
+            "Error Statistics",
+            f"**Total Errors:** {error_status.get('error_count', 'N/A')}\n"
+            f"**Error Rate:** {error_status.get('error_rate', 'N/A'):.2f}/hour\n"
+            f"**Recent Errors:** {error_status.get('recent_errors', 'N/A')} (last hour)",
+            True
+        ))
         
         # Add component status
         component_status = health_results["checks"].get("components", {})
         components = component_status.get("components", {})
-        component_text = ""
+        component_parts = []
         for component, status in components.items():
-            emoji = "✅" if status == "healthy" else "⚠️" if status == "warning" else "❌"
-            component_text += f"{emoji} **{component.replace('_', ' ').title()}**\n"
+            emoji = _STATUS_EMOJI.get(status, "❌")
+            component_parts.append(f"{emoji} **{_pretty_component(component)}**\n")
+        component_text = "".join(component_parts)
         
-        embed.add_field(
-            name="Component Status",
-            value=component_text or "No components checked",
-            inline=True
-        )
+        fields.append((
+            "Component Status",
+            component_text or "No components checked",
+            True
+        ))
         
         # Add health check information
-        embed.add_field(
-            name="Health Check",
-            value=f"**Last Check:** {self.last_health_check.strftime('%Y-%m-%d %H:%M:%S') if self.last_health_check else 'Never'}\n"
-                  f"**Status:** {health_results['status'].upper()}\n"
-                  f"**Interval:** {self.health_check_interval} minutes",
-            inline=True
-        )
+        fields.append((
+            "Health Check",
+            f"**Last Check:** {self.last_health_check.strftime(TS_FMT) if self.last_health_check else 'Never'}\n"
+            f"**Status:** {health_results['status'].upper()}\n"
+            f"**Interval:** {self.health_check_interval} minutes",
+            True
+        ))
         
         # Add warnings if any
         all_warnings = []
@@ -770,13 +1126,24 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
                 all_warnings.extend(check_data["warnings"])
         
         if all_warnings:
-            embed.add_field(
-                name="⚠️ Warnings",
-                value="\n".join(f"• {warning}" for warning in all_warnings),
-                inline=False
-            )
+            fields.append((
+                "⚠️ Warnings",
+                "• " + "\n• ".join(all_warnings),
+                False
+            ))
+        
+        footer = None
+        if cache_age is not None:
+            footer = f"Health check results are {cache_age:.0f}s old. Use !systemstatus force to refresh."
+        
+        embeds = self._paginate_fields(
+            fields,
+            lambda: self._embed_from_template(self._status_embed_template, description, color),
+            footer=footer
+        )
         
-        await ctx.send(embed=embed)
+        for embed in embeds:
+            await ctx.send(embed=embed)
     
     @commands.command(name="databasecheck")
     @commands.has_permissions(administrator=True)
@@ -787,112 +1154,95 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         Usage:
         !databasecheck - Check database integrity and structure
         """
-        await ctx.send("Performing database integrity check... This may take a moment.")
+        if self._db_check_lock.locked():
+            await ctx.send("A database integrity check is already running. Please wait for it to finish.")
+            return
         
-        try:
-            db_path = os.getenv("DATABASE_PATH", "data/database.db")
-            
-            # Create a new connection for integrity check
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Run integrity check
-            cursor.execute("PRAGMA integrity_check")
-            integrity_result = cursor.fetchone()[0]
-            
-            # Run foreign key check
-            cursor.execute("PRAGMA foreign_key_check")
-            foreign_key_result = cursor.fetchall()
-            
-            # Get table information
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall() if not row[0].startswith('sqlite_')]
+        # Take the lock before the first await so overlapping runs are rejected above
+        async with self._db_check_lock:
+            await ctx.send("Performing database integrity check... This may take a moment.")
             
-            # Get table statistics
-            table_stats = {}
-            for table in tables:
-                cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                row_count = cursor.fetchone()[0]
-                table_stats[table] = row_count
-            
-            # Close connection
-            conn.close()
-            
-            # Create embed
-            embed = discord.Embed(
-                title="Database Integrity Check",
-                description=f"Check performed on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                color=discord.Color.green() if integrity_result == "ok" and not foreign_key_result else discord.Color.red()
-            )
-            
-            # Add integrity result
-            embed.add_field(
-                name="Integrity Check",
-                value=f"**Result:** {integrity_result}",
-                inline=False
-            )
-            
-            # Add foreign key check result
-            if foreign_key_result:
-                fk_text = "Foreign key constraints violated:\n"
-                for violation in foreign_key_result[:10]:  # Show first 10 violations
-                    fk_text += f"• Table: {violation[0]}, Row: {violation[1]}, Parent: {violation[2]}\n"
-                if len(foreign_key_result) > 10:
-                    fk_text += f"...and {len(foreign_key_result) - 10} more violations"
+            try:
+                db_path = os.getenv("DATABASE_PATH", "data/database.db")
+                
+                # Run the blocking scan on a worker thread so the event loop stays responsive
+                loop = asyncio.get_running_loop()
+                probe = await loop.run_in_executor(None, self._run_integrity_probe, db_path)
+                
+                integrity_result = probe["integrity_result"]
+                foreign_key_result = probe["foreign_key_result"]
+                table_stats = probe["table_stats"]
+                
+                # Create embed
+                embed = discord.Embed(
+                    title="Database Integrity Check",
+                    description=f"Check performed on {datetime.now().strftime(TS_FMT)}",
+                    color=discord.Color.green() if integrity_result == "ok" and not foreign_key_result else discord.Color.red()
+                )
+                
+                # Add integrity result
                 embed.add_field(
-                    name="Foreign Key Check",
-                    value=fk_text,
+                    name="Integrity Check",
+                    value=f"**Result:** {integrity_result}",
                     inline=False
                 )
-            else:
+                
+                # Add foreign key check result
+                if foreign_key_result:
+                    fk_parts = ["Foreign key constraints violated:\n"]
+                    for violation in foreign_key_result[:10]:  # Show first 10 violations
+                        fk_parts.append(f"• Table: {violation[0]}, Row: {violation[1]}, Parent: {violation[2]}\n")
+                    if len(foreign_key_result) > 10:
+                        fk_parts.append(f"...and {len(foreign_key_result) - 10} more violations")
+                    embed.add_field(
+                        name="Foreign Key Check",
+                        value="".join(fk_parts),
+                        inline=False
+                    )
+                else:
+                    embed.add_field(
+                        name="Foreign Key Check",
+                        value="No foreign key violations found",
+                        inline=False
+                    )
+                
+                # Add table statistics
+                table_text = "".join(f"**{table}:** {count} rows\n" for table, count in table_stats.items())
+                
                 embed.add_field(
-                    name="Foreign Key Check",
-                    value="No foreign key violations found",
+                    name="Table Statistics",
+                    value=table_text,
                     inline=False
                 )
-            
-            # Add table statistics
-            table_text = ""
-            for table, count in table_stats.items():
-                table_text += f"**{table}:** {count} rows\n"
-            
-            embed.add_field(
-                name="Table Statistics",
-                value=table_text,
-                inline=False
-            )
-            
-            # Add database file info
-            db_size = os.path.getsize(db_path)
-            db_size_mb = db_size / (1024 * 1024)
-            db_modified = datetime.fromtimestamp(os.path.getmtime(db_path))
-            
-            embed.add_field(
-                name="Database File",
-                value=f"**Path:** {db_path}\n"
-                      f"**Size:** {db_size_mb:.2f} MB\n"
-                      f"**Last Modified:** {db_modified.strftime('%Y-%m-%d %H:%M:%S')}",
-                inline=False
-            )
-            
-            await ctx.send(embed=embed)
-            
-            # If there are issues, offer to attempt repair
-            if integrity_result != "ok" or foreign_key_result:
-                repair_msg = await ctx.send("Database issues detected. Would you like to attempt repair? (This will create a backup first)")
                 
-                # Add reaction options
-                await repair_msg.add_reaction("✅")  # Yes
-                await repair_msg.add_reaction("❌")  # No
+                # Add database file info
+                db_stat = probe["db_stat"]
+                db_size_mb = db_stat.st_size / (1024 * 1024)
+                db_modified = datetime.fromtimestamp(db_stat.st_mtime)
                 
-                # Wait for reaction
-                def check(reaction, user):
-                    return user == ctx.author and str(reaction.emoji) in ["✅", "❌"] and reaction.message.id == repair_msg.id
+                embed.add_field(
+                    name="Database File",
+                    value=f"**Path:** {db_path}\n"
+                          f"**Size:** {db_size_mb:.2f} MB\n"
+                          f"**Last Modified:** {db_modified.strftime(TS_FMT)}",
+                    inline=False
+                )
                 
-                try:
-                    reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=check)
+                await ctx.send(embed=embed)
+                
+                # If there are issues, offer to attempt repair
+                if integrity_result != "ok" or foreign_key_result:
+                    view = RepairConfirmView(ctx.author, timeout=60.0)
+                    repair_msg = await ctx.send(
+                        "Database issues detected. Would you like to attempt repair? (This will create a backup first)",
+                        view=view
+                    )
                     
-                    if str(reaction.emoji) == "✅":
+                    # Wait for a button press
+                    if await view.wait():
+                        await repair_msg.edit(view=None)
+                        await ctx.send("Repair option timed out.")
+                    elif view.confirmed:
                         await ctx.send("Creating database backup before repair...")
                         
                         # Create backup
@@ -907,13 +1257,10 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
                             await ctx.send("Database repair failed. Please check the logs for details.")
                     else:
                         await ctx.send("Repair cancelled.")
-                
-                except asyncio.TimeoutError:
-                    await ctx.send("Repair option timed out.")
-        
-        except Exception as e:
-            logger.error(f"Error performing database check: {str(e)}")
-            await ctx.send(f"Error performing database check: {str(e)}")
+            
+            except Exception as e:
+                logger.error("Error performing database check: %s", e)
+                await ctx.send(f"Error performing database check: {str(e)}")
     
     @commands.command(name="errorlog")
     @commands.has_permissions(administrator=True)
@@ -928,11 +1275,8 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             await ctx.send("No errors have been recorded.")
             return
         
-        # Sort errors by timestamp (newest first)
-        sorted_errors = sorted(self.error_history, key=lambda e: e["timestamp"], reverse=True)
-        
-        # Limit the number of errors to show
-        errors_to_show = sorted_errors[:min(limit, len(sorted_errors))]
+        # Errors are appended in order, so the newest are at the right end
+        errors_to_show = list(islice(reversed(self.error_history), max(limit, 0)))
         
         # Create embed
         embed = discord.Embed(
@@ -941,11 +1285,12 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
             color=discord.Color.red()
         )
         
+        add_field = embed.add_field
         for i, error in enumerate(errors_to_show):
-            timestamp = error["timestamp"].strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = error["timestamp"].strftime(TS_FMT)
             if "command" in error:
                 # Command error
-                embed.add_field(
+                add_field(
                     name=f"{i+1}. Command Error - {timestamp}",
                     value=f"**Command:** {error['command']}\n"
                           f"**Type:** {error['error_type']}\n"
@@ -954,7 +1299,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
                 )
             else:
                 # Event error
-                embed.add_field(
+                add_field(
                     name=f"{i+1}. Event Error - {timestamp}",
                     value=f"**Event:** {error['event']}\n"
                           f"**Type:** {error['error_type']}\n"
@@ -973,78 +1318,82 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         Usage:
         !healthcheck - Run a comprehensive system health check
         """
-        await ctx.send("Performing health check... This may take a moment.")
+        if self._health_lock.locked():
+            await ctx.send("A health check is already running. Please wait for it to finish.")
+            return
+        
+        # Take the lock before the first await so overlapping runs are rejected above
+        async with self._health_lock:
+            await ctx.send("Performing health check... This may take a moment.")
+            
+            # Perform health check
+            health_results = await self._perform_health_check(force=True)
         
-        # Perform health check
-        health_results = await self._perform_health_check()
+        description = f"Check performed on {datetime.now().strftime(TS_FMT)}"
+        color = (discord.Color.green() if health_results["status"] == "healthy" else
+                 discord.Color.gold() if health_results["status"] == "warning" else
+                 discord.Color.red())
         
-        # Create embed
-        embed = discord.Embed(
-            title="Health Check Results",
-            description=f"Check performed on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            color=discord.Color.green() if health_results["status"] == "healthy" else 
-                  discord.Color.gold() if health_results["status"] == "warning" else
-                  discord.Color.red()
-        )
+        # Collect fields first so they can be split across embeds
+        fields = []
         
         # Add overall status
-        embed.add_field(
-            name="Overall Status",
-            value=f"**{health_results['status'].upper()}**",
-            inline=False
-        )
+        fields.append(("Overall Status", f"**{health_results['status'].upper()}**", False))
         
         # Add individual check results
         for check_name, check_data in health_results["checks"].items():
-            status_emoji = "✅" if check_data.get("status") == "healthy" else "⚠️" if check_data.get("status") == "warning" else "❌"
+            get = check_data.get
+            status = get("status")
             
             # Format the check data
-            check_text = f"**Status:** {status_emoji} {check_data.get('status', 'unknown').upper()}\n"
+            check_parts = [f"**Status:** {_STATUS_EMOJI.get(status, '❌')} {(status or 'unknown').upper()}\n"]
+            append = check_parts.append
             
             # Add specific details based on check type
             if check_name == "system":
-                check_text += f"**CPU:** {check_data.get('cpu_percent', 'N/A')}%\n"
-                check_text += f"**Memory:** {check_data.get('memory_percent', 'N/A')}%\n"
-                check_text += f"**Disk:** {check_data.get('disk_percent', 'N/A')}%\n"
+                append(f"**CPU:** {get('cpu_percent', 'N/A')}%\n")
+                append(f"**Memory:** {get('memory_percent', 'N/A')}%\n")
+                append(f"**Disk:** {get('disk_percent', 'N/A')}%\n")
             elif check_name == "database":
-                check_text += f"**Integrity:** {check_data.get('integrity_result', 'N/A')}\n"
-                check_text += f"**FK Violations:** {check_data.get('foreign_key_violations', 'N/A')}\n"
-                check_text += f"**Size:** {check_data.get('db_size_mb', 'N/A'):.2f} MB\n"
+                append(f"**Integrity:** {get('integrity_result', 'N/A')}\n")
+                append(f"**FK Violations:** {get('foreign_key_violations', 'N/A')}\n")
+                append(f"**Size:** {get('db_size_mb', 'N/A'):.2f} MB\n")
             elif check_name == "discord":
-                check_text += f"**Connected:** {'Yes' if check_data.get('connected', False) else 'No'}\n"
-                check_text += f"**Latency:** {check_data.get('latency', 'N/A'):.2f}s\n"
-                check_text += f"**Guilds:** {check_data.get('guild_count', 'N/A')}\n"
+                append(f"**Connected:** {'Yes' if get('connected', False) else 'No'}\n")
+                append(f"**Latency:** {get('latency', 'N/A'):.2f}s\n")
+                append(f"**Guilds:** {get('guild_count', 'N/A')}\n")
             elif check_name == "errors":
-                check_text += f"**Total Errors:** {check_data.get('error_count', 'N/A')}\n"
-                check_text += f"**Error Rate:** {check_data.get('error_rate', 'N/A'):.2f}/hour\n"
-                check_text += f"**Recent Errors:** {check_data.get('recent_errors', 'N/A')} (last hour)\n"
+                append(f"**Total Errors:** {get('error_count', 'N/A')}\n")
+                append(f"**Error Rate:** {get('error_rate', 'N/A'):.2f}/hour\n")
+                append(f"**Recent Errors:** {get('recent_errors', 'N/A')} (last hour)\n")
             elif check_name == "components":
-                components = check_data.get("components", {})
-                for component, status in components.items():
-                    component_emoji = "✅" if status == "healthy" else "⚠️" if status == "warning" else "❌"
-                    check_text += f"{component_emoji} **{component.replace('_', ' ').title()}**\n"
+                for component, component_status in get("components", {}).items():
+                    component_emoji = _STATUS_EMOJI.get(component_status, "❌")
+                    append(f"{component_emoji} **{_pretty_component(component)}**\n")
             
             # Add warnings if any
-            if check_data.get("warnings"):
-                check_text += "\n**Warnings:**\n"
-                for warning in check_data["warnings"]:
-                    check_text += f"• {warning}\n"
+            warnings = get("warnings")
+            if warnings:
+                append("\n**Warnings:**\n")
+                for warning in warnings:
+                    append(f"• {warning}\n")
             
-            embed.add_field(
-                name=f"{check_name.capitalize()} Check",
-                value=check_text,
-                inline=False
-            )
+            fields.append((f"{check_name.capitalize()} Check", "".join(check_parts), False))
         
         # Add recovery information if applicable
         if hasattr(self, 'last_recovery_actions') and self.last_recovery_actions:
-            embed.add_field(
-                name="Recovery Actions",
-                value="\n".join(f"• {action}" for action in self.last_recovery_actions),
-                inline=False
-            )
-        
-        await ctx.send(embed=embed)
+            fields.append((
+                "Recovery Actions",
+                "\n".join(f"• {action}" for action in self.last_recovery_actions),
+                False
+            ))
+        
+        embeds = self._paginate_fields(
+            fields,
+            lambda: self._embed_from_template(self._health_embed_template, description, color)
+        )
+        for embed in embeds:
+            await ctx.send(embed=embed)
     
     @commands.command(name="adminnotify")
     @commands.has_permissions(administrator=True)
@@ -1071,8 +1420,8 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         # Set new notification channel
         self.admin_notification_channel_id = channel.id
         
-        # Update environment variable (this won't persist after restart)
-        os.environ["ADMIN_NOTIFICATION_CHANNEL_ID"] = str(channel.id)
+        # Persist so the setting survives restarts
+        self._save_config()
         
         await ctx.send(f"Admin notification channel set to {channel.mention}")
         
@@ -1107,7 +1456,7 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
                 
                 await ctx.send(
                     f"Current health check interval: Every {self.health_check_interval} minutes\n"
-                    f"Next check: {next_check.strftime('%Y-%m-%d %H:%M:%S') if next_check else 'Unknown'}"
+                    f"Next check: {next_check.strftime(TS_FMT) if next_check else 'Unknown'}"
                 )
             else:
                 await ctx.send("Scheduled health checks are disabled.")
@@ -1121,8 +1470,8 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         # Update interval
         self.health_check_interval = interval_minutes
         
-        # Update environment variable (this won't persist after restart)
-        os.environ["HEALTH_CHECK_INTERVAL_MINUTES"] = str(interval_minutes)
+        # Persist so the setting survives restarts
+        self._save_config()
         
         # Cancel existing task if any
         if hasattr(self, 'health_check_task'):
@@ -1136,11 +1485,92 @@ class SystemMonitorCog(commands.Cog, name="System Monitor"):
         else:
             await ctx.send("Scheduled health checks disabled")
     
+    def _load_config(self):
+        """Apply settings saved by the admin commands, if any"""
+        try:
+            with open(SYSTEM_MONITOR_CONFIG_PATH, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read %s: %s", SYSTEM_MONITOR_CONFIG_PATH, e)
+            return
+        
+        if isinstance(config.get("health_check_interval"), int):
+            self.health_check_interval = config["health_check_interval"]
+        if isinstance(config.get("admin_notification_channel_id"), int):
+            self.admin_notification_channel_id = config["admin_notification_channel_id"]
+    
+    def _save_config(self):
+        """Write the admin-configurable settings to disk atomically"""
+        config = {
+            "health_check_interval": self.health_check_interval,
+            "admin_notification_channel_id": self.admin_notification_channel_id
+        }
+        try:
+            config_dir = os.path.dirname(SYSTEM_MONITOR_CONFIG_PATH)
+            if config_dir:
+                os.makedirs(config_dir, exist_ok=True)
+            
+            # Write to a temporary file and rename so a crash never leaves a partial file
+            tmp_path = SYSTEM_MONITOR_CONFIG_PATH + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=2)
+            os.replace(tmp_path, SYSTEM_MONITOR_CONFIG_PATH)
+        except OSError as e:
+            logger.error("Error saving system monitor settings: %s", e)
+    
+    def _embed_from_template(self, template: discord.Embed, description: str, color: discord.Color) -> discord.Embed:
+        """Copy a static embed skeleton and fill in its description and color"""
+        embed = template.copy()
+        embed.description = description
+        embed.color = color
+        return embed
+    
+    def _paginate_fields(self, fields: List[Tuple[str, str, bool]], base_embed_factory,
+                         footer: Optional[str] = None) -> List[discord.Embed]:
+        """
+        Split embed fields across as many embeds as needed to stay within Discord's limits
+        
+        Each embed is within the limits on its own, so send them as separate messages.
+        
+        Args:
+            fields: List of (name, value, inline) tuples
+            base_embed_factory: Callable returning a new embed with title, description and color set
+            footer: Footer text for the last embed; counted against every embed's budget
+            
+        Returns:
+            List of embeds holding all fields, in order
+        """
+        embed = base_embed_factory()
+        base_len = len(embed.title or "") + len(embed.description or "") + len(footer or "")
+        embeds = [embed]
+        running_len = base_len
+        
+        for name, value, inline in fields:
+            if len(value) > EMBED_FIELD_VALUE_MAX:
+                value = value[:EMBED_FIELD_VALUE_MAX - 3] + "..."
+            field_len = len(name) + len(value)
+            
+            if embed.fields and (running_len + field_len > EMBED_CHAR_BUDGET or len(embed.fields) >= EMBED_FIELD_BUDGET):
+                embed = base_embed_factory()
+                embeds.append(embed)
+                running_len = base_len
+            
+            embed.add_field(name=name, value=value, inline=inline)
+            running_len += field_len
+        
+        if footer:
+            embed.set_footer(text=footer)
+        
+        return embeds
+    
     def _format_timedelta(self, td):
         """Format a timedelta into a readable string"""
         days = td.days
-        hours, remainder = divmod(td.seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
+        hours = td.seconds // 3600
+        minutes = td.seconds % 3600 // 60
+        seconds = td.seconds % 60
         
         parts = []
         if days:
@@ -12,31 +12,45 @@ from datetime import datetime
 
 logger = logging.getLogger("accountme_bot.utility_cog")
 
+# !ping edits its reply only when the measured response time differs from the estimate by more than this
+PING_EDIT_THRESHOLD_MS = 5
+
 class UtilityCog(commands.Cog, name="Utility"):
     """General utility commands for all users"""
     
     def __init__(self, bot):
         self.bot = bot
         self.start_time = datetime.now()
+        self._last_response_time = None  # ms taken by the previous !ping send
+        self._invite_url = None
     
     @commands.command(name="ping")
     async def ping_command(self, ctx):
         """Check the bot's response time"""
-        start_time = time.time()
-        message = await ctx.send("Pinging...")
-        end_time = time.time()
-        
         api_latency = round(self.bot.latency * 1000)
-        response_time = round((end_time - start_time) * 1000)
+        estimate = self._last_response_time
         
         embed = discord.Embed(
             title="🏓 Pong!",
             color=discord.Color.green()
         )
         embed.add_field(name="API Latency", value=f"{api_latency}ms", inline=True)
-        embed.add_field(name="Response Time", value=f"{response_time}ms", inline=True)
+        embed.add_field(
+            name="Response Time",
+            value=f"{estimate}ms" if estimate is not None else "measuring...",
+            inline=True
+        )
+        
+        # Send the final embed once, showing the previous measurement as an estimate
+        start_time = time.perf_counter()
+        message = await ctx.send(embed=embed)
+        response_time = round((time.perf_counter() - start_time) * 1000)
+        self._last_response_time = response_time
         
-        await message.edit(content=None, embed=embed)
+        # Only edit when the estimate was noticeably off
+        if estimate is None or abs(response_time - estimate) > PING_EDIT_THRESHOLD_MS:
+            embed.set_field_at(1, name="Response Time", value=f"{response_time}ms", inline=True)
+            await message.edit(embed=embed)
     
     @commands.command(name="info")
     async def info_command(self, ctx):
@@ -85,20 +99,23 @@ class UtilityCog(commands.Cog, name="Utility"):
     @commands.command(name="invite")
     async def invite_command(self, ctx):
         """Get an invite link for the bot"""
-        # This assumes the bot has the applications.commands scope as well
-        permissions = discord.Permissions(
-            read_messages=True,
-            send_messages=True,
-            embed_links=True,
-            attach_files=True,
-            read_message_history=True
-        )
-        
-        invite_url = discord.utils.oauth_url(
-            client_id=self.bot.user.id,
-            permissions=permissions,
-            scopes=("bot", "applications.commands")
-        )
+        # Built on first use, since bot.user is not available until login
+        if self._invite_url is None:
+            # This assumes the bot has the applications.commands scope as well
+            permissions = discord.Permissions(
+                read_messages=True,
+                send_messages=True,
+                embed_links=True,
+                attach_files=True,
+                read_message_history=True
+            )
+            
+            self._invite_url = discord.utils.oauth_url(
+                client_id=self.bot.user.id,
+                permissions=permissions,
+                scopes=("bot", "applications.commands")
+            )
+        invite_url = self._invite_url
         
         embed = discord.Embed(
             title="Invite AccountME Bot",
@@ -112,11 +129,8 @@ class UtilityCog(commands.Cog, name="Utility"):
     def _get_uptime(self):
         """Calculate and format the bot's uptime"""
         delta = datetime.now() - self.start_time
-        days = delta.days
-        hours, remainder = divmod(delta.seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        
-        return f"{days}d {hours}h {minutes}m {seconds}s"
+        seconds = delta.seconds
+        return f"{delta.days}d {seconds // 3600}h {seconds % 3600 // 60}m {seconds % 60}s"
 
 async def setup(bot):
     """Add the cog to the bot"""
@@ -6,16 +6,29 @@ Main bot implementation file
 
 import os
 import logging
+import logging.handlers
+import queue
 import discord
 from discord.ext import commands
 import sqlite3
 from dotenv import load_dotenv
 import asyncio
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+import signal
 import sys
 
+# Project root (the parent of the bot package)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directory scanned for cog extensions
+_COGS_DIR = Path(__file__).resolve().parent / "cogs"
+
 # Add the parent directory to sys.path to allow importing from utils
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(_PROJECT_ROOT)
 from utils.image_processor import ImageProcessor
 from utils.report_generator import ReportGenerator
 from utils.db_manager import DatabaseManager
@@ -23,27 +36,69 @@ from utils.db_manager import DatabaseManager
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging; records are queued by the logging call and written to the
+# file and console by a listener thread, so coroutines never block on log I/O
+_log_queue = queue.Queue(-1)
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_file_handler = logging.FileHandler("bot.log")
+_file_handler.setFormatter(_log_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+log_listener = logging.handlers.QueueListener(_log_queue, _file_handler, _stream_handler)
+log_listener.start()
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("bot.log"),
-        logging.StreamHandler()
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
+    # The listener's handlers apply the full format
+    format='%(message)s',
+    # Replace the default handler installed by modules that log while being imported
+    force=True
 )
 logger = logging.getLogger("accountme_bot")
 
 # Bot configuration
-TOKEN = os.getenv("DISCORD_TOKEN")
-COMMAND_PREFIX = os.getenv("COMMAND_PREFIX", "!")
-ADMIN_USER_IDS = os.getenv("ADMIN_USER_IDS", "").split(",")
+@dataclass(frozen=True)
+class Config:
+    """Bot settings read from the environment once at import"""
+    token: Optional[str]
+    command_prefix: str
+    admin_ids: Tuple[str, ...]
+    db_path: str
+    reports_dir: str
+
+def _load_config():
+    """Build the bot configuration from environment variables"""
+    return Config(
+        token=os.getenv("DISCORD_TOKEN"),
+        command_prefix=os.getenv("COMMAND_PREFIX", "!"),
+        # An unset ADMIN_USER_IDS means no admins, not one empty ID
+        admin_ids=tuple(
+            user_id.strip()
+            for user_id in os.getenv("ADMIN_USER_IDS", "").split(",")
+            if user_id.strip()
+        ),
+        db_path=os.getenv("DATABASE_PATH", "data/database.db"),
+        reports_dir=os.getenv("REPORTS_DIR", "data/reports")
+    )
+
+CONFIG = _load_config()
 
-# Initialize bot with intents
-intents = discord.Intents.default()
+# Initialize bot with only the intents the cogs consume
+intents = discord.Intents.none()
+intents.guilds = True  # Guild, channel and role events
+intents.guild_messages = True  # Commands and message listeners in servers
+intents.dm_messages = True  # Commands sent by direct message
 intents.message_content = True  # Needed to read message content
+intents.guild_reactions = True  # Reaction-based confirmations and pagination
+intents.dm_reactions = True
 intents.members = True  # Needed for member-related events
-bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
+intents.voice_states = True  # Voice activity logging
+intents.presences = False
+intents.typing = False
+bot = commands.Bot(command_prefix=CONFIG.command_prefix, intents=intents)
+
+# The bot's prefix, bound once for the per-message check in on_message
+_COMMAND_PREFIX = CONFIG.command_prefix
 
 # Initialize components
 image_processor = None
@@ -53,25 +108,10 @@ report_generator = None
 # Bot startup time
 startup_time = None
 
-# Method to get the image processor
-def get_image_processor():
-    """Get the image processor instance"""
-    return image_processor
-    
-# Method to get the database manager
-def get_db_manager():
-    """Get the database manager instance"""
-    return db_manager
-
-# Method to get the report generator
-def get_report_generator():
-    """Get the report generator instance"""
-    return report_generator
-    
-# Add the methods to the bot
-bot.get_image_processor = get_image_processor
-bot.db_manager = None  # Will be set in main()
-bot.report_generator = None  # Will be set in main()
+# Components shared with the cogs; set in main()
+bot.image_processor = None
+bot.db_manager = None
+bot.report_generator = None
 
 @bot.event
 async def on_ready():
@@ -89,7 +129,7 @@ async def on_ready():
     # Set bot presence
     await bot.change_presence(activity=discord.Activity(
         type=discord.ActivityType.listening,
-        name=f"{COMMAND_PREFIX}help"
+        name=f"{CONFIG.command_prefix}help"
     ))
 
 @bot.event
@@ -102,6 +142,24 @@ async def on_resumed():
     """Event triggered when the bot reconnects after a disconnect"""
     logger.info("Bot connection resumed")
 
+# Welcome embed sent to new guilds; built on the first join since its content never changes
+_WELCOME_EMBED = None
+
+def _build_welcome_embed():
+    """Build the welcome embed sent when the bot joins a guild"""
+    embed = discord.Embed(
+        title="AccountME Bot",
+        description="Thanks for adding me to your server! I'm an accounting and inventory management bot for Trapper Dan Clothing.",
+        color=discord.Color.blue()
+    )
+    embed.add_field(
+        name="Getting Started",
+        value=f"Use `{CONFIG.command_prefix}help` to see available commands.",
+        inline=False
+    )
+    embed.set_footer(text="AccountME Bot | Accounting & Inventory Management")
+    return embed
+
 @bot.event
 async def on_guild_join(guild):
     """Event triggered when the bot joins a new guild (server)"""
@@ -112,19 +170,11 @@ async def on_guild_join(guild):
                                                 if channel.permissions_for(guild.me).send_messages), None)
     
     if target_channel:
-        embed = discord.Embed(
-            title="AccountME Bot",
-            description="Thanks for adding me to your server! I'm an accounting and inventory management bot for Trapper Dan Clothing.",
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="Getting Started",
-            value=f"Use `{COMMAND_PREFIX}help` to see available commands.",
-            inline=False
-        )
-        embed.set_footer(text="AccountME Bot | Accounting & Inventory Management")
+        global _WELCOME_EMBED
+        if _WELCOME_EMBED is None:
+            _WELCOME_EMBED = _build_welcome_embed()
         
-        await target_channel.send(embed=embed)
+        await target_channel.send(embed=_WELCOME_EMBED.copy())
 
 @bot.event
 async def on_guild_remove(guild):
@@ -135,39 +185,56 @@ async def on_guild_remove(guild):
 async def on_message(message):
     """Event triggered when a message is sent in a channel the bot can see"""
     # Ignore messages from the bot itself
-    if message.author == bot.user:
+    if message.author.id == bot.user.id:
         return
     
-    # Process commands if the message starts with the command prefix
-    if message.content.startswith(COMMAND_PREFIX):
-        await bot.process_commands(message)
+    # Reject non-command messages here rather than passing every message through, since
+    # process_commands builds a full Context for each one just to find no command. Later
+    # message hooks (e.g. natural language processing) belong above this check.
+    if not message.content.startswith(_COMMAND_PREFIX):
         return
     
-    # For now, we don't need to process other messages
-    # This can be expanded later for natural language processing
+    await bot.process_commands(message)
 
 # Load cogs (extensions)
+@lru_cache(maxsize=1)
+def _discover_cogs(cogs_dir, mtime_ns):
+    """
+    List the cog extension names in a directory
+    
+    Cached on the directory's modification time, which changes whenever a file is
+    added, removed or renamed, so repeated loads skip the directory scan.
+    
+    Args:
+        cogs_dir: Directory containing the cog modules
+        mtime_ns: Modification time of cogs_dir in nanoseconds
+        
+    Returns:
+        Tuple of extension names
+    """
+    return tuple(f"bot.cogs.{path.stem}" for path in cogs_dir.glob("[!_]*.py"))
+
 async def load_extensions():
     """Load all cog extensions from the cogs directory"""
     logger.info("Loading extensions...")
     
-    # Get the cogs directory path
-    cogs_dir = os.path.join(os.path.dirname(__file__), "cogs")
-    
     # Check if the directory exists
-    if not os.path.exists(cogs_dir):
-        logger.warning(f"Cogs directory not found: {cogs_dir}")
+    if not _COGS_DIR.is_dir():
+        logger.warning(f"Cogs directory not found: {_COGS_DIR}")
         return
     
-    # Load all Python files in the cogs directory
-    for filename in os.listdir(cogs_dir):
-        if filename.endswith(".py") and not filename.startswith("_"):
-            extension_name = f"bot.cogs.{filename[:-3]}"
-            try:
-                await bot.load_extension(extension_name)
-                logger.info(f"Loaded extension: {extension_name}")
-            except Exception as e:
-                logger.error(f"Failed to load extension {extension_name}: {e}")
+    # Load all Python files not starting with an underscore concurrently
+    extension_names = _discover_cogs(_COGS_DIR, _COGS_DIR.stat().st_mtime_ns)
+    results = await asyncio.gather(
+        *(bot.load_extension(extension_name) for extension_name in extension_names),
+        return_exceptions=True
+    )
+    
+    for extension_name, result in zip(extension_names, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to load extension {extension_name}: {result}")
+        else:
+            logger.info(f"Loaded extension: {extension_name}")
 
 async def graceful_shutdown():
     """Perform a graceful shutdown of the bot"""
@@ -191,32 +258,33 @@ async def graceful_shutdown():
 
 async def main():
     """Main function to start the bot"""
+    registered_signals = []
+    start_task = None
     try:
         global image_processor, db_manager, report_generator
         
         logger.info("Starting AccountME Discord Bot...")
         
         # Ensure required environment variables are set
-        if not TOKEN:
+        if not CONFIG.token:
             logger.error("DISCORD_TOKEN environment variable is not set!")
             return
         
         # Ensure data directory exists
-        data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+        data_dir = os.path.join(_PROJECT_ROOT, "data")
         os.makedirs(data_dir, exist_ok=True)
         logger.info(f"Ensured data directory exists at {data_dir}")
         
         # Initialize database manager
-        db_path = os.getenv("DATABASE_PATH", "data/database.db")
-        db_manager = DatabaseManager(db_path)
+        db_path = CONFIG.db_path
+        db_manager = DatabaseManager(db_path, pool_size=max(4, os.cpu_count() or 1))
         logger.info(f"Database manager initialized with database at {db_path}")
         
         # Make db_manager accessible to the bot
         bot.db_manager = db_manager
         
         # Initialize report generator
-        reports_dir = os.getenv("REPORTS_DIR", "data/reports")
-        reports_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), reports_dir)
+        reports_path = os.path.join(_PROJECT_ROOT, CONFIG.reports_dir)
         os.makedirs(reports_path, exist_ok=True)
         logger.info(f"Ensured reports directory exists at {reports_path}")
         report_generator = ReportGenerator(db_manager, reports_path)
@@ -229,37 +297,54 @@ async def main():
         image_processor = ImageProcessor()
         logger.info("Image processor initialized")
         
+        # Make image_processor accessible to the bot
+        bot.image_processor = image_processor
+        
         # Load extensions (cogs)
         await load_extensions()
         
-        # Set up signal handlers for graceful shutdown
-        try:
-            import signal
-            
-            # Define signal handlers
-            def signal_handler(sig, frame):
-                logger.info(f"Received signal {sig}, initiating shutdown...")
-                asyncio.create_task(graceful_shutdown())
-            
-            # Register signal handlers
-            for sig in (signal.SIGINT, signal.SIGTERM):
-                signal.signal(sig, signal_handler)
-                
+        # Set up signal handlers for graceful shutdown. The handlers only set
+        # an event; the shutdown itself runs below, once, in this coroutine.
+        loop = asyncio.get_running_loop()
+        stop_event = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+                registered_signals.append(sig)
+            except (NotImplementedError, RuntimeError):
+                logger.warning(f"Signal handling for {sig} not available on this platform")
+        if registered_signals:
             logger.info("Signal handlers registered for graceful shutdown")
-        except (ImportError, AttributeError):
-            logger.warning("Signal handling not available on this platform")
         
-        # Start the bot
+        # Start the bot and run until it stops or a shutdown signal arrives
         logger.info("Connecting to Discord...")
-        await bot.start(TOKEN)
+        start_task = asyncio.create_task(bot.start(CONFIG.token))
+        stop_task = asyncio.create_task(stop_event.wait())
+        done, _ = await asyncio.wait(
+            {start_task, stop_task}, return_when=asyncio.FIRST_COMPLETED
+        )
+        stop_task.cancel()
+        if stop_task in done:
+            logger.info("Received shutdown signal, initiating shutdown...")
+        if start_task in done:
+            # Surface any exception raised by bot.start
+            start_task.result()
     except Exception as e:
         logger.critical(f"Fatal error in main function: {str(e)}")
         logger.exception("Exception details:")
     finally:
-        # Ensure we always attempt to close the bot connection
-        if not bot.is_closed():
-            await bot.close()
-            logger.info("Bot connection closed")
+        for sig in registered_signals:
+            asyncio.get_running_loop().remove_signal_handler(sig)
+        
+        # Shut down exactly once, even if startup failed before the bot was started;
+        # closing the bot also ends bot.start
+        await graceful_shutdown()
+        if start_task is not None and not start_task.done():
+            start_task.cancel()
+            try:
+                await start_task
+            except (asyncio.CancelledError, Exception):
+                pass
 
 # Entry point that handles running the async main function
 def run_bot():
@@ -271,6 +356,9 @@ def run_bot():
     except Exception as e:
         logger.critical(f"Unhandled exception in run_bot: {str(e)}")
         logger.exception("Exception details:")
+    finally:
+        # Flush queued log records and stop the listener thread
+        log_listener.stop()
 
 if __name__ == "__main__":
     run_bot()
\ No newline at end of file
@@ -4,6 +4,8 @@ Pytest configuration for AccountME Discord Bot tests
 
 import os
 import sys
+import uuid
+import shutil
 import pytest
 import sqlite3
 
@@ -12,21 +14,26 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.db_manager import DatabaseManager
 
-@pytest.fixture
-def test_db_path(tmp_path):
+@pytest.fixture(scope="session")
+def test_db_path():
     """
-    Create a temporary database path for testing
+    Create an in-memory database URI shared by the whole test session
+    
+    The shared cache lets every connection opened on the URI see the same
+    database, which lives only as long as one of them stays open.
     
     Returns:
-        Path to the test database
+        URI of the test database
     """
-    db_path = tmp_path / "test_database.db"
-    return str(db_path)
+    return f"file:testdb_{uuid.uuid4().hex}?mode=memory&cache=shared"
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def db_manager(test_db_path):
     """
-    Create a database manager instance for testing
+    Create a database manager instance shared by the whole test session
+    
+    The schema is built once; use db_txn in tests that write so their changes
+    are rolled back afterwards.
     
     Returns:
         DatabaseManager instance
@@ -34,7 +41,67 @@ def db_manager(test_db_path):
     manager = DatabaseManager(db_path=test_db_path)
     yield manager
     
-    # Cleanup
+    # Cleanup; closing the last connection frees the in-memory database
     manager.close()
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
\ No newline at end of file
+
+@pytest.fixture(scope="session")
+def reset_shared_mock():
+    """
+    Provide a helper that fully resets a mock shared by several tests
+    
+    reset_mock() alone keeps configured return values, side effects and
+    attributes a test assigned, so they leak into the next test. The helper
+    also clears return values and side effects on the mock and its children,
+    then calls configure to reassign the baseline attributes.
+    
+    Returns:
+        Function taking the shared mock and its configure callable
+    """
+    def reset(mock, configure):
+        mock.reset_mock(return_value=True, side_effect=True)
+        configure(mock)
+    
+    return reset
+
+@pytest.fixture(scope="session")
+def db_template(tmp_path_factory):
+    """
+    Build an on-disk database with the full schema once per test session
+    
+    Returns:
+        Path of the template database file
+    """
+    path = str(tmp_path_factory.mktemp("db_template") / "template.db")
+    
+    # Closing the manager checkpoints the WAL, so the main file holds the whole schema
+    DatabaseManager(db_path=path).close()
+    return path
+
+@pytest.fixture
+def file_db_path(db_template, tmp_path):
+    """
+    Copy the template database for a test that needs its own on-disk database
+    
+    Returns:
+        Path of a database file with the schema already applied
+    """
+    path = str(tmp_path / "test.db")
+    shutil.copyfile(db_template, path)
+    return path
+
+@pytest.fixture
+def db_txn(db_manager):
+    """
+    Run a test against the session database manager inside a savepoint
+    
+    Everything the test writes is rolled back on teardown, so each test starts
+    from the empty schema.
+    
+    Returns:
+        DatabaseManager instance
+    """
+    with db_manager.bulk() as conn:
+        conn.execute("SAVEPOINT test")
+        yield db_manager
+        conn.execute("ROLLBACK TO test")
+        conn.execute("RELEASE test")
@@ -7,7 +7,7 @@ import os
 import sys
 import time
 import random
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 # Add the parent directory to sys.path to allow importing from utils
@@ -25,102 +25,146 @@ def generate_test_data(db_manager, num_products=100, num_customers=20, num_sales
     colors = ['Black', 'White', 'Red', 'Blue', 'Green', 'Yellow', 'Purple', 'Orange', 'Grey']
     sizes = ['XS', 'S', 'M', 'L', 'XL', '2XL', '3XL']
     
-    for i in range(num_products):
-        category = random.choice(categories)
-        product_data = {
-            'name': f"Test Product {i+1}",
-            'category': category,
-            'subcategory': random.choice(subcategories),
-            'manufacturer': random.choice(manufacturers),
-            'vendor': f"Vendor {random.randint(1, 5)}",
-            'style': f"Style-{random.randint(1000, 9999)}",
-            'color': random.choice(colors),
-            'size': random.choice(sizes),
-            'sku': f"SKU-{i+1:04d}",
-            'quantity': random.randint(0, 100),
-            'cost_price': round(random.uniform(5.0, 30.0), 2),
-            'selling_price': round(random.uniform(10.0, 60.0), 2)
-        }
-        db_manager.add_product(product_data)
-    
-    # Generate customers
-    for i in range(num_customers):
-        customer_data = {
-            'name': f"Customer {i+1}",
-            'discord_id': f"discord_{i+1:04d}",
-            'contact_info': f"customer{i+1}@example.com"
-        }
-        db_manager.add_customer(customer_data)
-    
-    # Get all products and customers for sales
-    products = db_manager.list_products()
-    customers = db_manager.list_customers()
-    
-    # Generate sales
-    for i in range(num_sales):
-        # Random date in the last 90 days
-        sale_date = (datetime.now() - timedelta(days=random.randint(0, 90))).strftime("%Y-%m-%d")
-        customer = random.choice(customers) if customers else None
+    # Write everything in a single transaction instead of committing every row
+    with db_manager.bulk() as conn:
+        now = datetime.now().isoformat()
         
-        # Create sale data
-        sale_data = {
-            'customer_id': customer['customer_id'] if customer else None,
-            'date': sale_date,
-            'total_amount': 0,  # Will be calculated from items
-            'payment_method': random.choice(['Cash', 'Credit Card', 'PayPal', 'Venmo']),
-            'notes': f"Test sale {i+1}"
-        }
+        # Draw every categorical column in one call each instead of once per row
+        product_choices = zip(
+            range(num_products),
+            random.choices(categories, k=num_products),
+            random.choices(subcategories, k=num_products),
+            random.choices(manufacturers, k=num_products),
+            random.choices(colors, k=num_products),
+            random.choices(sizes, k=num_products)
+        )
+        product_rows = [
+            (
+                f"Test Product {i+1}",
+                category,
+                subcategory,
+                manufacturer,
+                f"Vendor {random.randint(1, 5)}",
+                f"Style-{random.randint(1000, 9999)}",
+                color,
+                size,
+                f"SKU-{i+1:04d}",
+                random.randint(0, 100),
+                round(random.uniform(5.0, 30.0), 2),
+                round(random.uniform(10.0, 60.0), 2),
+                now
+            )
+            for i, category, subcategory, manufacturer, color, size in product_choices
+        ]
+        # The bulk transaction holds the write lock, so the new rows take consecutive
+        # rowids after the current maximum
+        first_product_id = conn.execute("SELECT COALESCE(MAX(product_id), 0) + 1 FROM products").fetchone()[0]
+        conn.executemany(
+            """INSERT INTO products (name, category, subcategory, manufacturer, vendor, style, color,
+                                     size, sku, quantity, cost_price, selling_price, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            product_rows
+        )
         
-        # Create sale items
-        num_items = random.randint(1, 5)
-        sale_items = []
-        total_amount = 0
+        # Generate customers
+        customer_rows = [
+            (f"Customer {i+1}", f"discord_{i+1:04d}", f"customer{i+1}@example.com")
+            for i in range(num_customers)
+        ]
+        first_customer_id = conn.execute("SELECT COALESCE(MAX(customer_id), 0) + 1 FROM customers").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO customers (name, discord_id, contact_info) VALUES (?, ?, ?)",
+            customer_rows
+        )
         
-        for _ in range(num_items):
-            product = random.choice(products)
-            quantity = random.randint(1, 3)
-            price = product['selling_price']
-            item_total = quantity * price
-            total_amount += item_total
-            
-            sale_items.append({
-                'product_id': product['product_id'],
-                'quantity': quantity,
-                'price': price
-            })
+        # Keep what was just inserted for the sales instead of reading it back
+        products = [
+            {'product_id': product_id, 'selling_price': row[11]}
+            for product_id, row in enumerate(product_rows, start=first_product_id)
+        ]
+        customers = [
+            {'customer_id': customer_id}
+            for customer_id in range(first_customer_id, first_customer_id + len(customer_rows))
+        ]
         
-        sale_data['total_amount'] = round(total_amount, 2)
+        # Generate sales
+        sale_customers = random.choices(customers, k=num_sales) if customers else [None] * num_sales
+        payment_methods = random.choices(['Cash', 'Credit Card', 'PayPal', 'Venmo'], k=num_sales)
         
-        # Add sale with items
-        try:
-            db_manager.add_sale(sale_data, sale_items)
-        except Exception as e:
-            print(f"Error adding sale: {e}")
-    
-    # Generate expenses
-    expense_categories = ['Supplies', 'Rent', 'Utilities', 'Marketing', 'Shipping', 'Inventory']
-    
-    for i in range(num_expenses):
-        # Random date in the last 90 days
-        expense_date = (datetime.now() - timedelta(days=random.randint(0, 90))).strftime("%Y-%m-%d")
+        for i, customer, payment_method in zip(range(num_sales), sale_customers, payment_methods):
+            # Random date in the last 90 days
+            sale_date = (datetime.now() - timedelta(days=random.randint(0, 90))).strftime("%Y-%m-%d")
+            
+            # Create sale data
+            sale_data = {
+                'customer_id': customer['customer_id'] if customer else None,
+                'date': sale_date,
+                'total_amount': 0,  # Will be calculated from items
+                'payment_method': payment_method,
+                'notes': f"Test sale {i+1}"
+            }
+            
+            # Create sale items
+            num_items = random.randint(1, 5)
+            sale_items = []
+            total_amount = 0
+            
+            for product in random.choices(products, k=num_items):
+                quantity = random.randint(1, 3)
+                price = product['selling_price']
+                item_total = quantity * price
+                total_amount += item_total
+                
+                sale_items.append({
+                    'product_id': product['product_id'],
+                    'quantity': quantity,
+                    'price': price
+                })
+            
+            sale_data['total_amount'] = round(total_amount, 2)
+            
+            # Add sale with items
+            try:
+                db_manager.add_sale(sale_data, sale_items)
+            except Exception as e:
+                print(f"Error adding sale: {e}")
         
-        expense_data = {
-            'date': expense_date,
-            'vendor': f"Vendor {random.randint(1, 10)}",
-            'amount': round(random.uniform(10.0, 500.0), 2),
-            'category': random.choice(expense_categories),
-            'description': f"Test expense {i+1}",
-            'receipt_image': f"https://example.com/receipts/receipt_{i+1}.jpg"
-        }
+        # Generate expenses
+        expense_categories = ['Supplies', 'Rent', 'Utilities', 'Marketing', 'Shipping', 'Inventory']
         
-        db_manager.add_expense(expense_data)
+        for i, expense_category in zip(range(num_expenses),
+                                       random.choices(expense_categories, k=num_expenses)):
+            # Random date in the last 90 days
+            expense_date = (datetime.now() - timedelta(days=random.randint(0, 90))).strftime("%Y-%m-%d")
+            
+            expense_data = {
+                'date': expense_date,
+                'vendor': f"Vendor {random.randint(1, 10)}",
+                'amount': round(random.uniform(10.0, 500.0), 2),
+                'category': expense_category,
+                'description': f"Test expense {i+1}",
+                'receipt_image': f"https://example.com/receipts/receipt_{i+1}.jpg"
+            }
+            
+            db_manager.add_expense(expense_data)
     
     print("Test data generation complete")
 
-def run_performance_tests(db_path="data/performance_test.db"):
-    """Run performance tests on the database manager"""
+IN_MEMORY_DB_PATH = "file:performance_test?mode=memory&cache=shared"
+
+def run_performance_tests(db_path="data/performance_test.db", in_memory=False):
+    """
+    Run performance tests on the database manager
+    
+    Args:
+        db_path: Path of the database file to create
+        in_memory: Use a shared-cache in-memory database instead of db_path, so the
+            timings exclude disk I/O and fsync
+    """
     # Create a fresh database for testing
-    if os.path.exists(db_path):
+    if in_memory:
+        db_path = IN_MEMORY_DB_PATH
+    elif os.path.exists(db_path):
         os.remove(db_path)
     
     # Initialize database manager
@@ -235,13 +279,10 @@ def run_performance_tests(db_path="data/performance_test.db"):
     # Test 5: Database query with and without indexes
     print("\nTest 5: Database query with indexes")
     
-    # Create a connection to run raw SQL
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Query with indexes (already created by migrations)
+    # Query with indexes (already created by migrations), run on the manager's
+    # own read connection so it reuses the page cache warmed by Tests 1-4
     start_time = time.time()
-    cursor.execute("""
+    results = db_manager.raw_execute("""
     SELECT p.*, COUNT(si.sale_item_id) as sales_count
     FROM products p
     LEFT JOIN sale_items si ON p.product_id = si.product_id
@@ -249,16 +290,60 @@ def run_performance_tests(db_path="data/performance_test.db"):
     GROUP BY p.product_id
     ORDER BY sales_count DESC
     """)
-    results = cursor.fetchall()
     with_indexes_time = time.time() - start_time
     print(f"  Query time with indexes: {with_indexes_time:.6f} seconds")
     
-    # Close connection
-    conn.close()
+    # Test 6: Read throughput across reader threads and pool sizes; runs before the
+    # clean up because an in-memory database is freed with its last connection
+    run_concurrent_lookup_test(db_path)
     
     # Clean up
     db_manager.close()
+    
     print("\nPerformance tests completed")
 
+def run_concurrent_lookup_test(db_path="data/performance_test.db", threads=(1, 2, 4, 8, 16),
+                               iterations=1000, pool_sizes=(0, 1, 4, 8)):
+    """
+    Measure SKU lookup throughput as the number of reader threads grows
+    
+    Runs the SKU query through execute_query rather than get_product_by_sku so the
+    result cache does not hide the database work being measured. Pool size 0 sends
+    every lookup through the single write connection, as a baseline.
+    
+    Args:
+        db_path: Path to a database already filled by generate_test_data
+        threads: Thread counts to sweep
+        iterations: Total lookups per thread count
+        pool_sizes: Reader pool sizes to sweep
+    """
+    print("\nConcurrent SKU lookup throughput")
+    
+    # Draw the SKUs up front so the timed loop only measures lookups
+    skus = [f"SKU-{i:04d}" for i in random.choices(range(1, 101), k=iterations)]
+    query = "SELECT * FROM products WHERE sku = ?"
+    
+    for pool_size in pool_sizes:
+        db_manager = DatabaseManager(db_path, pool_size=pool_size)
+        print(f"  Pool size {pool_size}:")
+        
+        for thread_count in threads:
+            with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                start_time = time.time()
+                list(executor.map(lambda sku: db_manager.execute_query(query, (sku,)), skus))
+                elapsed = time.time() - start_time
+            
+            ops_per_second = iterations / elapsed if elapsed > 0 else float("inf")
+            print(f"    {thread_count:>2} threads: {ops_per_second:,.0f} ops/sec")
+        
+        db_manager.close()
+
 if __name__ == "__main__":
-    run_performance_tests()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Run AccountME database performance tests")
+    parser.add_argument("--in-memory", action="store_true",
+                        help="use an in-memory database to isolate CPU cost from disk I/O")
+    args = parser.parse_args()
+    
+    run_performance_tests(in_memory=args.in_memory)
\ No newline at end of file
@@ -7,19 +7,23 @@ import os
 import discord
 import asyncio
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch, AsyncMock, mock_open
+from unittest.mock import MagicMock, patch, AsyncMock
+from discord.ext import tasks
 import io
+import csv
+import copy
 
-from bot.cogs.backup_cog import BackupCog
+from bot.cogs.backup_cog import BackupCog, SNAPSHOT_CACHE_TTL, CLEANUP_BATCH_SIZE, RECENT_BACKUPS_LIMIT
+
+# Timestamp shared by the mock backup records
+BACKUP_TIMESTAMP = "2025-03-26T12:00:00"
 
 class TestBackupCog:
     """Test cases for the BackupCog class"""
     
-    @pytest.fixture
-    def mock_bot(self):
-        """Create a mock bot instance"""
-        bot = MagicMock()
-        bot.loop = asyncio.get_event_loop()
+    @staticmethod
+    def configure_mock_bot(bot):
+        """Give the mock bot a database manager returning the mock records"""
         bot.db_manager = MagicMock()
         bot.db_manager.backup_database.return_value = "test/path/backup.db"
         bot.db_manager.list_products.return_value = [
@@ -39,74 +43,131 @@ class TestBackupCog:
                 'filename': 'backup_20250326.db',
                 'location': 'data/backups',
                 'size': 1024,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': BACKUP_TIMESTAMP
             }
         ]
         bot.get_channel = MagicMock(return_value=MagicMock())
+    
+    @pytest.fixture(scope="module")
+    def shared_mock_bot(self):
+        """Create a mock bot instance once per module"""
+        bot = MagicMock()
+        self.configure_mock_bot(bot)
         return bot
     
     @pytest.fixture
-    def backup_cog(self, mock_bot):
-        """Create a BackupCog instance with a mock bot"""
-        with patch.object(BackupCog, '_scheduled_backup_task', return_value=asyncio.Future()):
-            cog = BackupCog(mock_bot)
-            cog.backup_task = MagicMock()
-            return cog
+    def mock_bot(self, shared_mock_bot, reset_shared_mock):
+        """Hand each test the shared mock bot and fully reset it afterwards"""
+        yield shared_mock_bot
+        reset_shared_mock(shared_mock_bot, self.configure_mock_bot)
+    
+    @pytest.fixture(scope="module")
+    def base_backup_cog(self, shared_mock_bot):
+        """Create a BackupCog instance with the shared mock bot once per module"""
+        with patch.object(tasks.Loop, 'start'):
+            return BackupCog(shared_mock_bot)
+    
+    @pytest.fixture
+    def backup_cog(self, base_backup_cog, mock_bot):
+        """Give each test its own shallow copy of the BackupCog"""
+        return copy.copy(base_backup_cog)
     
     @pytest.mark.asyncio
-    async def test_create_backup(self, backup_cog, mock_bot):
+    async def test_create_backup(self, backup_cog, mock_bot, tmp_path, monkeypatch):
         """Test the _create_backup method"""
+        # Point the mock backup at a real file so the upload path opens it for real
+        backup_file = tmp_path / "backup.db"
+        backup_file.write_bytes(b'test data')
+        backup_path = str(backup_file)
+        monkeypatch.setattr(mock_bot.db_manager.backup_database, 'return_value', backup_path)
+        
         # Mock context
         ctx = MagicMock()
         ctx.send = AsyncMock()
         
-        # Mock os.path functions to avoid file not found errors
-        with patch('os.path.getsize', return_value=1024), \
-             patch('os.path.exists', return_value=True), \
-             patch('os.path.basename', return_value='backup.db'):
-            
-            # Test with backup channel not set
-            backup_cog.backup_channel_id = 0
+        # Test with backup channel not set
+        backup_cog.backup_channel_id = 0
+        backup_cog.compression_enabled = True
+        result = await backup_cog._create_backup(ctx)
+        
+        # Verify backup was created, compressed before any upload
+        assert result == backup_path
+        mock_bot.db_manager.backup_database.assert_called_once_with(compress=True)
+        ctx.send.assert_called_once()
+        
+        # Reset mocks
+        mock_bot.db_manager.backup_database.reset_mock()
+        ctx.send.reset_mock()
+        
+        # Test with backup channel set
+        backup_cog.backup_channel_id = 123456789
+        channel = mock_bot.get_channel.return_value
+        channel.send = AsyncMock()
+        
+        try:
             result = await backup_cog._create_backup(ctx)
             
-            # Verify backup was created
-            assert result == "test/path/backup.db"
+            # Verify backup was created and uploaded
+            assert result == backup_path
             mock_bot.db_manager.backup_database.assert_called_once()
+            mock_bot.get_channel.assert_called_once_with(123456789)
+            channel.send.assert_called_once()
             ctx.send.assert_called_once()
             
-            # Reset mocks
-            mock_bot.db_manager.backup_database.reset_mock()
-            ctx.send.reset_mock()
+            # The backup is handed to discord.File by path and read from disk
+            db_file = channel.send.call_args.kwargs['files'][0]
+            assert db_file.filename == "backup.db"
+            assert db_file.fp.read() == b'test data'
             
-            # Test with backup channel set
-            backup_cog.backup_channel_id = 123456789
-            channel = mock_bot.get_channel.return_value
-            channel.send = AsyncMock()
+            # A second backup reuses the cached channel
+            await backup_cog._create_backup(ctx)
+            assert mock_bot.get_channel.call_count == 1
+            assert channel.send.call_count == 2
             
-            # Mock open to avoid file not found
-            with patch('builtins.open', mock_open(read_data=b'test data')):
-                result = await backup_cog._create_backup(ctx)
-                
-                # Verify backup was created and uploaded
-                assert result == "test/path/backup.db"
-                mock_bot.db_manager.backup_database.assert_called_once()
-                mock_bot.get_channel.assert_called_once_with(123456789)
-                channel.send.assert_called_once()
-                ctx.send.assert_called_once()
+            # Editing the channel invalidates the cache
+            await backup_cog.on_guild_channel_update(MagicMock(id=123456789), MagicMock(id=123456789))
+            await backup_cog._create_backup(ctx)
+            assert mock_bot.get_channel.call_count == 2
+        finally:
+            # channel.send is mocked, so close the files discord.py would have closed
+            for call in channel.send.call_args_list:
+                for file in call.kwargs['files']:
+                    file.close()
     
-    @pytest.mark.asyncio
-    async def test_generate_inventory_snapshot(self, backup_cog, mock_bot):
+    def test_generate_inventory_snapshot(self, backup_cog, mock_bot):
         """Test the _generate_inventory_snapshot method"""
         products = mock_bot.db_manager.list_products.return_value
         
         # Generate snapshot
-        csv_data = await backup_cog._generate_inventory_snapshot(products)
+        csv_data = backup_cog._generate_inventory_snapshot(products)
         
         # Verify CSV format
         assert isinstance(csv_data, str)
         assert "product_id,name,category" in csv_data
         assert "Test Product,blank" in csv_data
         assert "snapshot_date" in csv_data
+        assert csv_data.count('\n') == len(products) + 1
+        
+        # The same product list within the TTL reuses the cached CSV with a fresh snapshot_date
+        with patch('csv.writer', wraps=csv.writer) as writer:
+            reused = backup_cog._generate_inventory_snapshot(products)
+            writer.assert_not_called()
+        old_rows = list(csv.reader(io.StringIO(csv_data)))
+        new_rows = list(csv.reader(io.StringIO(reused)))
+        assert [row[:-1] for row in new_rows] == [row[:-1] for row in old_rows]
+        assert new_rows[1][-1] >= old_rows[1][-1]
+        
+        # A new product list, as returned after a product write, rebuilds the CSV
+        with patch('csv.writer', wraps=csv.writer) as writer:
+            backup_cog._generate_inventory_snapshot(copy.copy(products))
+            writer.assert_called_once()
+        
+        # Once the TTL has passed the CSV is rebuilt
+        products = backup_cog._snapshot[0]
+        backup_cog._snapshot = (products, backup_cog._snapshot[1] - SNAPSHOT_CACHE_TTL - 1) + backup_cog._snapshot[2:]
+        with patch('csv.writer', wraps=csv.writer) as writer:
+            backup_cog._generate_inventory_snapshot(products)
+            writer.assert_called_once()
     
     @pytest.mark.asyncio
     async def test_backup_command(self, backup_cog):
@@ -145,6 +206,13 @@ class TestBackupCog:
         assert isinstance(embed, discord.Embed)
         assert "Database Backups" in embed.title
         assert "Database Backups" in embed.title
+        
+        # Limits outside 1..RECENT_BACKUPS_LIMIT are clamped and the user is told
+        for limit in (RECENT_BACKUPS_LIMIT + 25, -3):
+            await backup_cog.list_backups_command.callback(backup_cog, ctx, limit)
+            embed = ctx.send.call_args.kwargs['embed']
+            assert len(embed.fields) == 1
+            assert f"between 1 and {RECENT_BACKUPS_LIMIT}" in embed.description
     
     @pytest.mark.asyncio
     async def test_inventory_snapshot_command(self, backup_cog, mock_bot):
@@ -153,12 +221,19 @@ class TestBackupCog:
         ctx = MagicMock()
         ctx.send = AsyncMock()
         
+        # Run the worker-thread calls inline so the payload build can be observed
+        run_in_thread = AsyncMock(side_effect=lambda fn, *args: fn(*args))
+        
         # Call the method directly (not through command decorator)
-        await backup_cog.inventory_snapshot_command.callback(backup_cog, ctx)
+        with patch('bot.cogs.backup_cog._run_in_thread', run_in_thread):
+            await backup_cog.inventory_snapshot_command.callback(backup_cog, ctx)
         
         # Verify
         mock_bot.db_manager.list_products.assert_called_once()
         ctx.send.assert_called()
+        # The CSV is generated inside the threaded payload build, not on the event loop
+        assert run_in_thread.await_args_list[-1].args[0] == backup_cog._build_snapshot_payload
+        assert backup_cog._snapshot[0] is mock_bot.db_manager.list_products.return_value
         
         # Verify file was created
         args, kwargs = ctx.send.call_args_list[1]
@@ -166,6 +241,32 @@ class TestBackupCog:
         assert isinstance(kwargs['file'], discord.File)
         assert 'embed' in kwargs
         assert isinstance(kwargs['embed'], discord.Embed)
+        
+        # Verify the summary totals
+        fields = {field.name: field.value for field in kwargs['embed'].fields}
+        assert fields["Total Products"] == "1"
+        assert fields["Total Items"] == "10"
+        assert fields["Total Value"] == "$50.00"
+        assert "**Blank**: 1 products, 10 items, $50.00" in fields["Category Breakdown"]
+    
+    @pytest.mark.asyncio
+    async def test_recent_backups_cached(self, backup_cog, mock_bot):
+        """Test that listing backups reuses one fetch and never loads products"""
+        ctx = MagicMock()
+        ctx.send = AsyncMock()
+        
+        await backup_cog.list_backups_command.callback(backup_cog, ctx)
+        await backup_cog.list_backups_command.callback(backup_cog, ctx, 5)
+        
+        assert mock_bot.db_manager.execute_query.call_count == 1
+        mock_bot.db_manager.list_products.assert_not_called()
+        
+        # A new backup invalidates the cached list
+        with patch('os.path.getsize', return_value=1024):
+            backup_cog.backup_channel_id = 0
+            await backup_cog._create_backup(ctx)
+        await backup_cog.list_backups_command.callback(backup_cog, ctx)
+        assert mock_bot.db_manager.execute_query.call_count == 2
     
     @pytest.mark.asyncio
     async def test_backup_channel_command(self, backup_cog):
@@ -201,9 +302,6 @@ class TestBackupCog:
         ctx = MagicMock()
         ctx.send = AsyncMock()
         
-        # Mock backup_task._when to return a number
-        backup_cog.backup_task._when = asyncio.get_event_loop().time() + 3600  # 1 hour from now
-        
         # Test with no interval provided
         await backup_cog.backup_schedule_command.callback(backup_cog, ctx)
         ctx.send.assert_called_once()
@@ -212,30 +310,29 @@ class TestBackupCog:
         ctx.send.reset_mock()
         
         # Test with interval provided - disable backups
-        with patch.object(backup_cog, '_scheduled_backup_task'):
+        with patch.object(tasks.Loop, 'cancel') as cancel:
             # Set new interval to 0 (disable backups)
             await backup_cog.backup_schedule_command.callback(backup_cog, ctx, 0)
             
             # Verify
             assert backup_cog.backup_interval_hours == 0
             ctx.send.assert_called_once()
+            cancel.assert_called_once()
             
         # Reset mock
         ctx.send.reset_mock()
         
         # Test with interval provided - enable backups
-        with patch.object(backup_cog, '_scheduled_backup_task'), \
-             patch.object(backup_cog.bot.loop, 'create_task', return_value=MagicMock()):
-            # Ensure backup_task exists and has a cancel method
-            backup_cog.backup_task = MagicMock()
-            backup_cog.backup_task.cancel = MagicMock()
-            
+        with patch.object(tasks.Loop, 'change_interval') as change_interval, \
+             patch.object(tasks.Loop, 'start') as start:
             # Set new interval
             await backup_cog.backup_schedule_command.callback(backup_cog, ctx, 12)
             
             # Verify
             assert backup_cog.backup_interval_hours == 12
             ctx.send.assert_called_once()
+            change_interval.assert_called_once_with(hours=12)
+            start.assert_called_once()
     
     @pytest.mark.asyncio
     async def test_backup_retention_command(self, backup_cog):
@@ -259,4 +356,20 @@ class TestBackupCog:
             # Verify
             assert backup_cog.backup_retention_days == 15
             ctx.send.assert_called_once()
-            backup_cog._cleanup_old_backups.assert_called_once()
\ No newline at end of file
+            backup_cog._cleanup_old_backups.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_cleanup_old_backups(self, backup_cog, mock_bot, monkeypatch):
+        """Test that retention cleanup deletes every batch in one transaction"""
+        old_backups = [
+            {'backup_id': backup_id, 'filename': f'backup_{backup_id}.db', 'location': 'missing'}
+            for backup_id in range(CLEANUP_BATCH_SIZE + 1)
+        ]
+        monkeypatch.setattr(mock_bot.db_manager.execute_query, 'return_value', old_backups)
+        backup_cog.backup_retention_days = 30
+        
+        await backup_cog._cleanup_old_backups()
+        
+        mock_bot.db_manager.bulk.assert_called_once_with(tables=('backup_log',))
+        assert mock_bot.db_manager.delete.call_count == 2
+        assert len(mock_bot.db_manager.delete.call_args_list[0].args[2]) == CLEANUP_BATCH_SIZE
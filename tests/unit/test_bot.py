@@ -6,6 +6,7 @@ import os
 import pytest
 import discord
 import asyncio
+from dataclasses import replace
 from unittest.mock import AsyncMock, MagicMock, patch
 from discord.ext import commands
 import sys
@@ -17,11 +18,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 # Import the bot module
 from bot import main
 
-@pytest.fixture
-def mock_bot():
-    """Create a mock bot instance for testing"""
-    # Create a mock bot with the same attributes as the real bot
-    bot = MagicMock(spec=commands.Bot)
+def configure_mock_bot(bot):
+    """Give the mock bot the same attributes as the real bot"""
     bot.user = MagicMock()
     bot.user.name = "TestBot"
     bot.user.id = 123456789
@@ -31,9 +29,21 @@ def mock_bot():
     bot.start = AsyncMock()
     bot.load_extension = AsyncMock()
     bot.change_presence = AsyncMock()
-    
+    bot.process_commands = AsyncMock()
+
+@pytest.fixture(scope="module")
+def shared_mock_bot():
+    """Create a mock bot instance once per module (spec introspection of commands.Bot is slow)"""
+    bot = MagicMock(spec=commands.Bot)
+    configure_mock_bot(bot)
     return bot
 
+@pytest.fixture
+def mock_bot(shared_mock_bot, reset_shared_mock):
+    """Hand each test the shared mock bot and fully reset it afterwards"""
+    yield shared_mock_bot
+    reset_shared_mock(shared_mock_bot, configure_mock_bot)
+
 @pytest.mark.asyncio
 async def test_on_ready(mock_bot):
     """Test the on_ready event handler"""
@@ -108,7 +118,7 @@ async def test_on_message(mock_bot):
     message.author = MagicMock()  # Different from bot.user
     message.content = "!help"
     with patch('bot.main.bot', mock_bot):
-        with patch('bot.main.COMMAND_PREFIX', "!"):
+        with patch('bot.main._COMMAND_PREFIX', "!"):
             await main.on_message(message)
     
     # Verify that process_commands was called
@@ -120,18 +130,20 @@ async def test_on_message(mock_bot):
     # Test case 3: Message from another user without command prefix
     message.content = "Hello bot"
     with patch('bot.main.bot', mock_bot):
-        with patch('bot.main.COMMAND_PREFIX', "!"):
+        with patch('bot.main._COMMAND_PREFIX', "!"):
             await main.on_message(message)
     
-    # Verify that process_commands was not called
+    # Verify that the message was rejected before reaching process_commands
     mock_bot.process_commands.assert_not_called()
 
 @pytest.mark.asyncio
-async def test_load_extensions(mock_bot):
+async def test_load_extensions(mock_bot, tmp_path):
     """Test the load_extensions function"""
-    # Create a mock for os.path.exists and os.listdir
-    with patch('os.path.exists', return_value=True), \
-         patch('os.listdir', return_value=['admin_cog.py', 'help_cog.py', '_ignored.py']), \
+    # Create a cogs directory with private modules and non-Python files mixed in
+    for filename in ['admin_cog.py', 'help_cog.py', '_ignored.py', '__init__.py', 'notes.txt']:
+        (tmp_path / filename).touch()
+    
+    with patch('bot.main._COGS_DIR', tmp_path), \
          patch('bot.main.bot', mock_bot):
         
         await main.load_extensions()
@@ -140,6 +152,19 @@ async def test_load_extensions(mock_bot):
     assert mock_bot.load_extension.call_count == 2
     mock_bot.load_extension.assert_any_call('bot.cogs.admin_cog')
     mock_bot.load_extension.assert_any_call('bot.cogs.help_cog')
+    
+    # Verify that every load was actually awaited by the gather
+    mock_bot.load_extension.assert_any_await('bot.cogs.admin_cog')
+    mock_bot.load_extension.assert_any_await('bot.cogs.help_cog')
+    
+    # Loading again with the directory unchanged reuses the cached scan
+    hits = main._discover_cogs.cache_info().hits
+    with patch('bot.main._COGS_DIR', tmp_path), \
+         patch('bot.main.bot', mock_bot):
+        await main.load_extensions()
+    
+    assert main._discover_cogs.cache_info().hits == hits + 1
+    assert mock_bot.load_extension.call_count == 4
 
 @pytest.mark.asyncio
 async def test_graceful_shutdown(mock_bot):
@@ -154,7 +179,7 @@ async def test_graceful_shutdown(mock_bot):
 async def test_main_function(mock_bot):
     """Test the main function"""
     # Mock the environment variables
-    with patch('bot.main.TOKEN', 'fake_token'), \
+    with patch('bot.main.CONFIG', replace(main.CONFIG, token='fake_token')), \
          patch('bot.main.bot', mock_bot), \
          patch('bot.main.load_extensions', AsyncMock()), \
          patch('bot.main.graceful_shutdown', AsyncMock()):
@@ -163,4 +188,18 @@ async def test_main_function(mock_bot):
         await main.main()
     
     # Verify that the bot was started
-    mock_bot.start.assert_called_once_with('fake_token')
\ No newline at end of file
+    mock_bot.start.assert_called_once_with('fake_token')
+
+@pytest.mark.asyncio
+async def test_main_function_startup_failure(mock_bot):
+    """Test that main still shuts down when startup fails before the bot starts"""
+    shutdown = AsyncMock()
+    with patch('bot.main.CONFIG', replace(main.CONFIG, token='fake_token')), \
+         patch('bot.main.bot', mock_bot), \
+         patch('bot.main.load_extensions', AsyncMock(side_effect=RuntimeError("bad cog"))), \
+         patch('bot.main.graceful_shutdown', shutdown):
+        
+        await main.main()
+    
+    mock_bot.start.assert_not_called()
+    shutdown.assert_awaited_once()
\ No newline at end of file
@@ -6,6 +6,7 @@ import os
 import pytest
 import sqlite3
 from datetime import datetime
+from unittest.mock import patch
 from utils.db_manager import DatabaseManager
 
 class TestDatabaseManager:
@@ -13,40 +14,63 @@ class TestDatabaseManager:
     Test cases for the DatabaseManager class
     """
     
-    def test_initialization(self, db_manager, test_db_path):
+    def test_initialization(self, tmp_path):
         """Test database initialization"""
-        # Check that the database file was created
-        assert os.path.exists(test_db_path)
-        
-        # Check that the connection is valid
-        assert db_manager.connection is not None
-        
-        # Check that tables were created
-        tables = db_manager.execute_query(
-            "SELECT name FROM sqlite_master WHERE type='table'"
-        )
-        table_names = [table['name'] for table in tables]
-        
-        # Verify essential tables exist
-        assert 'products' in table_names
-        assert 'expenses' in table_names
-        assert 'customers' in table_names
-        assert 'sales' in table_names
-        assert 'sale_items' in table_names
-        assert 'audit_log' in table_names
-        assert 'backup_log' in table_names
-        assert 'schema_version' in table_names
+        # WAL mode and the database file only exist on disk, so this test does not
+        # use the in-memory session database
+        test_db_path = str(tmp_path / "init.db")
+        db_manager = DatabaseManager(db_path=test_db_path)
+        try:
+            # Check that the database file was created
+            assert os.path.exists(test_db_path)
+            
+            # Check that the connection is valid
+            assert db_manager.connection is not None
+            
+            # Check that the connection is in WAL mode with the tuned pragmas
+            conn = db_manager.connection
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64000
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+            assert os.path.exists(test_db_path + "-wal")
+            
+            # Check that tables were created
+            tables = db_manager.execute_query(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            )
+            table_names = [table['name'] for table in tables]
+            
+            # Verify essential tables exist
+            assert 'products' in table_names
+            assert 'expenses' in table_names
+            assert 'customers' in table_names
+            assert 'sales' in table_names
+            assert 'sale_items' in table_names
+            assert 'audit_log' in table_names
+            assert 'backup_log' in table_names
+            assert 'schema_version' in table_names
+            
+            # Retention cleanup filters backups by timestamp through an index
+            plan = db_manager.execute_query(
+                "EXPLAIN QUERY PLAN SELECT backup_id FROM backup_log WHERE timestamp < ?",
+                ("2025-01-01T00:00:00",)
+            )
+            assert any('idx_backup_log_timestamp' in row['detail'] for row in plan)
+        finally:
+            db_manager.close()
     
-    def test_execute_query(self, db_manager):
+    def test_execute_query(self, db_txn):
         """Test execute_query method"""
         # Insert test data
-        db_manager.execute_update(
+        db_txn.execute_update(
             "INSERT INTO products (name, category, sku) VALUES (?, ?, ?)",
             ("Test Product", "blank", "TEST-001")
         )
         
         # Query the data
-        results = db_manager.execute_query(
+        results = db_txn.execute_query(
             "SELECT * FROM products WHERE sku = ?",
             ("TEST-001",)
         )
@@ -56,10 +80,10 @@ class TestDatabaseManager:
         assert results[0]['name'] == "Test Product"
         assert results[0]['category'] == "blank"
     
-    def test_execute_update(self, db_manager):
+    def test_execute_update(self, db_txn):
         """Test execute_update method"""
         # Insert test data
-        rows_affected = db_manager.execute_update(
+        rows_affected = db_txn.execute_update(
             "INSERT INTO products (name, category, sku) VALUES (?, ?, ?)",
             ("Test Product", "blank", "TEST-001")
         )
@@ -68,7 +92,7 @@ class TestDatabaseManager:
         assert rows_affected == 1
         
         # Update the data
-        rows_affected = db_manager.execute_update(
+        rows_affected = db_txn.execute_update(
             "UPDATE products SET name = ? WHERE sku = ?",
             ("Updated Product", "TEST-001")
         )
@@ -77,13 +101,13 @@ class TestDatabaseManager:
         assert rows_affected == 1
         
         # Verify the update
-        results = db_manager.execute_query(
+        results = db_txn.execute_query(
             "SELECT name FROM products WHERE sku = ?",
             ("TEST-001",)
         )
         assert results[0]['name'] == "Updated Product"
     
-    def test_insert(self, db_manager):
+    def test_insert(self, db_txn):
         """Test insert method"""
         # Insert a product
         product_data = {
@@ -95,13 +119,13 @@ class TestDatabaseManager:
             'selling_price': 29.99
         }
         
-        product_id = db_manager.insert('products', product_data)
+        product_id = db_txn.insert('products', product_data)
         
         # Verify product was inserted
         assert product_id > 0
         
         # Verify the product data
-        product = db_manager.get_by_id('products', 'product_id', product_id)
+        product = db_txn.get_by_id('products', 'product_id', product_id)
         assert product['name'] == 'Test Product'
         assert product['category'] == 'blank'
         assert product['sku'] == 'TEST-001'
@@ -109,7 +133,7 @@ class TestDatabaseManager:
         assert product['cost_price'] == 15.99
         assert product['selling_price'] == 29.99
     
-    def test_update(self, db_manager):
+    def test_update(self, db_txn):
         """Test update method"""
         # Insert a product
         product_data = {
@@ -119,7 +143,7 @@ class TestDatabaseManager:
             'quantity': 10
         }
         
-        product_id = db_manager.insert('products', product_data)
+        product_id = db_txn.insert('products', product_data)
         
         # Update the product
         update_data = {
@@ -127,7 +151,7 @@ class TestDatabaseManager:
             'quantity': 20
         }
         
-        rows_affected = db_manager.update(
+        rows_affected = db_txn.update(
             'products', update_data, 'product_id = ?', (product_id,)
         )
         
@@ -135,12 +159,12 @@ class TestDatabaseManager:
         assert rows_affected == 1
         
         # Verify the update
-        product = db_manager.get_by_id('products', 'product_id', product_id)
+        product = db_txn.get_by_id('products', 'product_id', product_id)
         assert product['name'] == 'Updated Product'
         assert product['quantity'] == 20
         assert product['category'] == 'blank'  # Unchanged field
     
-    def test_delete(self, db_manager):
+    def test_delete(self, db_txn):
         """Test delete method"""
         # Insert a product
         product_data = {
@@ -149,23 +173,23 @@ class TestDatabaseManager:
             'sku': 'TEST-001'
         }
         
-        product_id = db_manager.insert('products', product_data)
+        product_id = db_txn.insert('products', product_data)
         
         # Verify product exists
-        product = db_manager.get_by_id('products', 'product_id', product_id)
+        product = db_txn.get_by_id('products', 'product_id', product_id)
         assert product is not None
         
         # Delete the product
-        rows_affected = db_manager.delete('products', 'product_id = ?', (product_id,))
+        rows_affected = db_txn.delete('products', 'product_id = ?', (product_id,))
         
         # Verify row was deleted
         assert rows_affected == 1
         
         # Verify product no longer exists
-        product = db_manager.get_by_id('products', 'product_id', product_id)
+        product = db_txn.get_by_id('products', 'product_id', product_id)
         assert product is None
     
-    def test_get_by_id(self, db_manager):
+    def test_get_by_id(self, db_txn):
         """Test get_by_id method"""
         # Insert a product
         product_data = {
@@ -174,10 +198,10 @@ class TestDatabaseManager:
             'sku': 'TEST-001'
         }
         
-        product_id = db_manager.insert('products', product_data)
+        product_id = db_txn.insert('products', product_data)
         
         # Get the product by ID
-        product = db_manager.get_by_id('products', 'product_id', product_id)
+        product = db_txn.get_by_id('products', 'product_id', product_id)
         
         # Verify product data
         assert product['name'] == 'Test Product'
@@ -185,10 +209,10 @@ class TestDatabaseManager:
         assert product['sku'] == 'TEST-001'
         
         # Test non-existent ID
-        non_existent = db_manager.get_by_id('products', 'product_id', 9999)
+        non_existent = db_txn.get_by_id('products', 'product_id', 9999)
         assert non_existent is None
     
-    def test_add_product(self, db_manager):
+    def test_add_product(self, db_txn):
         """Test add_product method"""
         # Add a product
         product_data = {
@@ -205,20 +229,20 @@ class TestDatabaseManager:
             'selling_price': 15.00
         }
         
-        product_id = db_manager.add_product(product_data)
+        product_id = db_txn.add_product(product_data)
         
         # Verify product was added
         assert product_id > 0
         
         # Verify product data
-        product = db_manager.get_product(product_id)
+        product = db_txn.get_product(product_id)
         assert product['name'] == 'Test T-Shirt'
         assert product['category'] == 'blank'
         assert product['subcategory'] == 'for_pressing'
         assert product['quantity'] == 25
         assert product['updated_at'] is not None  # Should have a timestamp
     
-    def test_update_product(self, db_manager):
+    def test_update_product(self, db_txn):
         """Test update_product method"""
         # Add a product
         product_data = {
@@ -228,7 +252,7 @@ class TestDatabaseManager:
             'quantity': 25
         }
         
-        product_id = db_manager.add_product(product_data)
+        product_id = db_txn.add_product(product_data)
         
         # Update the product
         update_data = {
@@ -236,18 +260,18 @@ class TestDatabaseManager:
             'quantity': 30
         }
         
-        success = db_manager.update_product(product_id, update_data)
+        success = db_txn.update_product(product_id, update_data)
         
         # Verify update was successful
         assert success is True
         
         # Verify product data
-        product = db_manager.get_product(product_id)
+        product = db_txn.get_product(product_id)
         assert product['name'] == 'Updated T-Shirt'
         assert product['quantity'] == 30
         assert product['category'] == 'blank'  # Unchanged field
     
-    def test_get_product_by_sku(self, db_manager):
+    def test_get_product_by_sku(self, db_txn):
         """Test get_product_by_sku method"""
         # Add a product
         product_data = {
@@ -257,10 +281,10 @@ class TestDatabaseManager:
             'quantity': 25
         }
         
-        product_id = db_manager.add_product(product_data)
+        product_id = db_txn.add_product(product_data)
         
         # Get product by SKU
-        product = db_manager.get_product_by_sku('TB-BLK-L')
+        product = db_txn.get_product_by_sku('TB-BLK-L')
         
         # Verify product data
         assert product['product_id'] == product_id
@@ -268,10 +292,10 @@ class TestDatabaseManager:
         assert product['category'] == 'blank'
         
         # Test non-existent SKU
-        non_existent = db_manager.get_product_by_sku('NON-EXISTENT')
+        non_existent = db_txn.get_product_by_sku('NON-EXISTENT')
         assert non_existent is None
     
-    def test_list_products(self, db_manager):
+    def test_list_products(self, db_txn):
         """Test list_products method"""
         # Add multiple products
         products = [
@@ -297,34 +321,45 @@ class TestDatabaseManager:
             }
         ]
         
-        for product in products:
-            db_manager.add_product(product)
+        columns = ('name', 'category', 'subcategory', 'sku', 'quantity')
+        inserted = db_txn.insert_many(
+            'products', columns, [tuple(p.get(c) for c in columns) for p in products]
+        )
+        assert inserted == 3
         
         # List all products
-        all_products = db_manager.list_products()
+        all_products = db_txn.list_products()
         assert len(all_products) == 3
         
         # List by category
-        blank_products = db_manager.list_products(category='blank')
+        blank_products = db_txn.list_products(category='blank')
         assert len(blank_products) == 2
         assert all(p['category'] == 'blank' for p in blank_products)
         
-        dtf_products = db_manager.list_products(category='dtf')
+        dtf_products = db_txn.list_products(category='dtf')
         assert len(dtf_products) == 1
         assert dtf_products[0]['category'] == 'dtf'
         
         # List by subcategory
-        for_pressing = db_manager.list_products(subcategory='for_pressing')
+        for_pressing = db_txn.list_products(subcategory='for_pressing')
         assert len(for_pressing) == 1
         assert for_pressing[0]['subcategory'] == 'for_pressing'
         
         # List by category and subcategory
-        blank_ready = db_manager.list_products(category='blank', subcategory='ready_to_sell')
+        blank_ready = db_txn.list_products(category='blank', subcategory='ready_to_sell')
         assert len(blank_ready) == 1
         assert blank_ready[0]['category'] == 'blank'
         assert blank_ready[0]['subcategory'] == 'ready_to_sell'
+        
+        # List with a column projection
+        projected = db_txn.list_products(category='dtf', fields=('name', 'sku', 'quantity'))
+        assert projected == [{'name': 'DTF Print Logo', 'sku': 'DTF-LOGO-001', 'quantity': 50}]
+        
+        # Unknown columns are rejected
+        with pytest.raises(ValueError):
+            db_txn.list_products(fields=('name', 'sku; DROP TABLE products'))
     
-    def test_adjust_product_quantity(self, db_manager):
+    def test_adjust_product_quantity(self, db_txn):
         """Test adjust_product_quantity method"""
         # Add a product
         product_data = {
@@ -334,10 +369,10 @@ class TestDatabaseManager:
             'quantity': 25
         }
         
-        product_id = db_manager.add_product(product_data)
+        product_id = db_txn.add_product(product_data)
         
         # Increase quantity
-        success = db_manager.adjust_product_quantity(
+        success = db_txn.adjust_product_quantity(
             product_id, 5, 'test_user', 'Received new stock'
         )
         
@@ -345,11 +380,11 @@ class TestDatabaseManager:
         assert success is True
         
         # Verify quantity was updated
-        product = db_manager.get_product(product_id)
+        product = db_txn.get_product(product_id)
         assert product['quantity'] == 30
         
         # Decrease quantity
-        success = db_manager.adjust_product_quantity(
+        success = db_txn.adjust_product_quantity(
             product_id, -10, 'test_user', 'Removed damaged items'
         )
         
@@ -357,11 +392,11 @@ class TestDatabaseManager:
         assert success is True
         
         # Verify quantity was updated
-        product = db_manager.get_product(product_id)
+        product = db_txn.get_product(product_id)
         assert product['quantity'] == 20
         
         # Check audit log
-        audit_logs = db_manager.execute_query(
+        audit_logs = db_txn.execute_query(
             "SELECT * FROM audit_log WHERE entity_id = ? AND entity_type = 'product'",
             (product_id,)
         )
@@ -370,8 +405,19 @@ class TestDatabaseManager:
         assert len(audit_logs) == 2
         assert any('30' in log['details'] for log in audit_logs)
         assert any('20' in log['details'] for log in audit_logs)
+        
+        # A failed adjustment undoes its own writes without ending the test's transaction
+        with patch.object(db_txn, 'add_inventory_history', side_effect=sqlite3.OperationalError("boom")):
+            assert db_txn.adjust_product_quantity(product_id, 7, 'test_user') is False
+        
+        assert db_txn.get_product(product_id)['quantity'] == 20
+        audit_logs = db_txn.execute_query(
+            "SELECT * FROM audit_log WHERE entity_id = ? AND entity_type = 'product'",
+            (product_id,)
+        )
+        assert len(audit_logs) == 2
     
-    def test_add_expense(self, db_manager):
+    def test_add_expense(self, db_txn):
         """Test add_expense method"""
         # Add an expense
         expense_data = {
@@ -382,20 +428,20 @@ class TestDatabaseManager:
             'description': 'Blank t-shirts purchase'
         }
         
-        expense_id = db_manager.add_expense(expense_data)
+        expense_id = db_txn.add_expense(expense_data)
         
         # Verify expense was added
         assert expense_id > 0
         
         # Verify expense data
-        expense = db_manager.get_expense(expense_id)
+        expense = db_txn.get_expense(expense_id)
         assert expense['date'] == '2025-03-18'
         assert expense['vendor'] == 'Test Supplier'
         assert expense['amount'] == 150.75
         assert expense['category'] == 'inventory'
         assert expense['description'] == 'Blank t-shirts purchase'
     
-    def test_update_expense(self, db_manager):
+    def test_update_expense(self, db_txn):
         """Test update_expense method"""
         # Add an expense
         expense_data = {
@@ -405,7 +451,7 @@ class TestDatabaseManager:
             'category': 'inventory'
         }
         
-        expense_id = db_manager.add_expense(expense_data)
+        expense_id = db_txn.add_expense(expense_data)
         
         # Update the expense
         update_data = {
@@ -413,18 +459,18 @@ class TestDatabaseManager:
             'description': 'Updated description'
         }
         
-        success = db_manager.update_expense(expense_id, update_data)
+        success = db_txn.update_expense(expense_id, update_data)
         
         # Verify update was successful
         assert success is True
         
         # Verify expense data
-        expense = db_manager.get_expense(expense_id)
+        expense = db_txn.get_expense(expense_id)
         assert expense['amount'] == 175.50
         assert expense['description'] == 'Updated description'
         assert expense['vendor'] == 'Test Supplier'  # Unchanged field
     
-    def test_list_expenses(self, db_manager):
+    def test_list_expenses(self, db_txn):
         """Test list_expenses method"""
         # Add multiple expenses
         expenses = [
@@ -448,31 +494,141 @@ class TestDatabaseManager:
             }
         ]
         
-        for expense in expenses:
-            db_manager.add_expense(expense)
+        columns = ('date', 'vendor', 'amount', 'category')
+        db_txn.insert_many('expenses', columns, [tuple(e[c] for c in columns) for e in expenses])
         
         # List all expenses
-        all_expenses = db_manager.list_expenses()
+        all_expenses = db_txn.list_expenses()
         assert len(all_expenses) == 3
         
         # List by date range
-        date_range = db_manager.list_expenses(start_date='2025-03-16', end_date='2025-03-18')
+        date_range = db_txn.list_expenses(start_date='2025-03-16', end_date='2025-03-18')
         assert len(date_range) == 2
         
         # List by category
-        inventory = db_manager.list_expenses(category='inventory')
+        inventory = db_txn.list_expenses(category='inventory')
         assert len(inventory) == 2
         assert all(e['category'] == 'inventory' for e in inventory)
         
-        utilities = db_manager.list_expenses(category='utilities')
+        utilities = db_txn.list_expenses(category='utilities')
         assert len(utilities) == 1
         assert utilities[0]['category'] == 'utilities'
         
         # List by date range and category
-        filtered = db_manager.list_expenses(
+        filtered = db_txn.list_expenses(
             start_date='2025-03-15',
             end_date='2025-03-16',
             category='inventory'
         )
         assert len(filtered) == 2
-        assert all(e['category'] == 'inventory' for e in filtered)
\ No newline at end of file
+        assert all(e['category'] == 'inventory' for e in filtered)
+    
+    def test_read_pool(self, file_db_path):
+        """Test that pooled read connections see committed writes and reject writes"""
+        manager = DatabaseManager(db_path=file_db_path, pool_size=2)
+        try:
+            product_id = manager.add_product({
+                'name': 'Pooled Product',
+                'category': 'blank',
+                'sku': 'POOL-001',
+                'quantity': 5
+            })
+            
+            # Reads go through the pool and see the committed row
+            product = manager.get_product_by_sku('POOL-001')
+            assert product['product_id'] == product_id
+            assert manager._reader_count == 1
+            
+            # Pooled connections are read-only
+            with manager.read_conn() as conn:
+                with pytest.raises(sqlite3.OperationalError):
+                    conn.execute("DELETE FROM products")
+            
+            # A reader checked out during close() is closed when returned, not pooled again
+            with manager.read_conn() as conn:
+                manager.close()
+            assert manager._read_pool.empty()
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+        finally:
+            manager.close()
+        
+        assert manager._reader_count == 0
+    
+    def test_memory_database(self):
+        """Test that a private :memory: database works without a reader pool"""
+        manager = DatabaseManager(db_path=":memory:", pool_size=4)
+        try:
+            # Readers would each open their own empty database, so the pool is disabled
+            assert manager.pool_size == 0
+            
+            manager.add_customer({'name': 'Memory Customer', 'discord_id': 'memory_1'})
+            assert manager.get_customer_by_discord_id('memory_1')['name'] == 'Memory Customer'
+        finally:
+            manager.close()
+    
+    def test_bulk(self, file_db_path):
+        """Test that bulk() commits once on success and rolls back on error"""
+        # Uses its own database, since the session manager is never committed to
+        manager = DatabaseManager(db_path=file_db_path)
+        try:
+            with manager.bulk() as conn:
+                conn.executemany(
+                    "INSERT INTO customers (name, discord_id) VALUES (?, ?)",
+                    [("Bulk Customer 1", "bulk_1"), ("Bulk Customer 2", "bulk_2")]
+                )
+                manager.add_customer({'name': 'Bulk Customer 3', 'discord_id': 'bulk_3'})
+                
+                # Nothing is committed until the block exits
+                assert manager.connection.in_transaction
+            
+            assert not manager.connection.in_transaction
+            assert len(manager.list_customers()) == 3
+            
+            # An exception discards every write in the block
+            with pytest.raises(RuntimeError):
+                with manager.bulk():
+                    manager.add_customer({'name': 'Discarded Customer'})
+                    raise RuntimeError("abort")
+            
+            assert len(manager.list_customers()) == 3
+        finally:
+            manager.close()
+    
+    def test_bulk_tables(self, file_db_path):
+        """Test that bulk(tables) clears only the cache entries for those tables"""
+        manager = DatabaseManager(db_path=file_db_path)
+        try:
+            manager.add_customer({'name': 'Cached Customer', 'discord_id': 'cached_1'})
+            product_id = manager.add_product({
+                'name': 'Cached Product', 'category': 'blank', 'sku': 'CACHED-1',
+                'quantity': 5, 'cost_price': 1.0, 'selling_price': 2.0
+            })
+            manager.list_customers()
+            manager.get_product_by_sku('CACHED-1')
+            
+            assert manager.adjust_product_quantity(product_id, 3, 'user_1')
+            
+            # The customer listing survives; the product lookups are refreshed
+            assert any('customers' in key for key in manager.cache)
+            assert manager.get_product_by_sku('CACHED-1')['quantity'] == 8
+        finally:
+            manager.close()
+    
+    def test_restore_uri_database(self, file_db_path, tmp_path, monkeypatch):
+        """Test that restoring into a "file:" URI database does not create a stray file"""
+        source = DatabaseManager(db_path=file_db_path)
+        try:
+            source.add_customer({'name': 'Restored Customer', 'discord_id': 'restored_1'})
+            backup_path = source.backup_database(str(tmp_path / "backups"), compress=False)
+        finally:
+            source.close()
+        
+        monkeypatch.chdir(tmp_path)
+        manager = DatabaseManager(db_path=f"file:restore_{tmp_path.name}?mode=memory&cache=shared")
+        try:
+            assert manager.restore_database(backup_path)
+            assert manager.get_customer_by_discord_id('restored_1')['name'] == 'Restored Customer'
+            assert not list(tmp_path.glob("file:*"))
+        finally:
+            manager.close()
@@ -6,6 +6,7 @@ import pytest
 import discord
 from discord.ext import commands
 from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
 import sys
 import os
 
@@ -15,19 +16,36 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 # Import the cog
 from bot.cogs.help_cog import HelpCog
 
-@pytest.fixture
-def mock_bot():
-    """Create a mock bot instance for testing"""
-    bot = MagicMock(spec=commands.Bot)
+def configure_mock_bot(bot):
+    """Give the mock bot the attributes the HelpCog uses"""
     bot.remove_command = MagicMock()
     bot.commands = []
     bot.get_command = MagicMock()
+    bot.add_cog = AsyncMock()
+
+@pytest.fixture(scope="module")
+def shared_mock_bot():
+    """Create a mock bot instance once per module (spec introspection of commands.Bot is slow)"""
+    bot = MagicMock(spec=commands.Bot)
+    configure_mock_bot(bot)
     return bot
 
 @pytest.fixture
-def help_cog(mock_bot):
-    """Create a HelpCog instance for testing"""
-    return HelpCog(mock_bot)
+def mock_bot(shared_mock_bot, reset_shared_mock):
+    """Hand each test the shared mock bot and fully reset it afterwards"""
+    yield shared_mock_bot
+    reset_shared_mock(shared_mock_bot, configure_mock_bot)
+
+@pytest.fixture(scope="module")
+def shared_help_cog(shared_mock_bot):
+    """Create a HelpCog instance once per module"""
+    return HelpCog(shared_mock_bot)
+
+@pytest.fixture
+def help_cog(shared_help_cog, mock_bot):
+    """Hand each test the shared HelpCog with no active help sessions"""
+    shared_help_cog.active_help_sessions.clear()
+    return shared_help_cog
 
 @pytest.fixture
 def mock_ctx():
@@ -43,27 +61,26 @@ def mock_ctx():
     
     return ctx
 
+@pytest.fixture(scope="module")
+def shared_help_commands():
+    """Create the mock commands listed by the help command once per module"""
+    # The help command only reads attributes, so plain namespaces stand in for commands
+    admin_command = SimpleNamespace(name="admin", hidden=False, cog_name="Admin")
+    inventory_command = SimpleNamespace(name="inventory", hidden=False, cog_name="Inventory")
+    hidden_command = SimpleNamespace(name="hidden", hidden=True, cog_name="Admin")
+    
+    return [admin_command, inventory_command, hidden_command]
+
+@pytest.fixture
+def help_commands(shared_help_commands):
+    """Hand each test its own list of the shared mock commands"""
+    return list(shared_help_commands)
+
 @pytest.mark.asyncio
-async def test_help_command_no_args(help_cog, mock_ctx, mock_bot):
+async def test_help_command_no_args(help_cog, mock_ctx, mock_bot, help_commands):
     """Test the help command with no arguments"""
-    # Create some mock commands
-    admin_command = MagicMock(spec=commands.Command)
-    admin_command.name = "admin"
-    admin_command.hidden = False
-    admin_command.cog_name = "Admin"
-    
-    inventory_command = MagicMock(spec=commands.Command)
-    inventory_command.name = "inventory"
-    inventory_command.hidden = False
-    inventory_command.cog_name = "Inventory"
-    
-    hidden_command = MagicMock(spec=commands.Command)
-    hidden_command.name = "hidden"
-    hidden_command.hidden = True
-    hidden_command.cog_name = "Admin"
-    
     # Add commands to the bot
-    mock_bot.commands = [admin_command, inventory_command, hidden_command]
+    mock_bot.commands = help_commands
     
     # Call the help command method directly
     await help_cog.help_command(help_cog, mock_ctx)
@@ -92,13 +109,14 @@ async def test_help_command_no_args(help_cog, mock_ctx, mock_bot):
 async def test_help_command_with_command(help_cog, mock_ctx, mock_bot):
     """Test the help command with a specific command"""
     # Create a mock command
-    command = MagicMock(spec=commands.Command)
-    command.name = "test"
-    command.hidden = False
-    command.help = "Test command help text"
-    command.signature = "<arg1> [arg2]"
-    command.aliases = ["t", "tst"]
-    command.cog_name = "Test"
+    command = SimpleNamespace(
+        name="test",
+        hidden=False,
+        help="Test command help text",
+        signature="<arg1> [arg2]",
+        aliases=["t", "tst"],
+        cog_name="Test"
+    )
     
     # Set up the mock bot to return our command
     mock_bot.get_command.return_value = command
@@ -157,9 +175,7 @@ async def test_help_command_command_not_found(help_cog, mock_ctx, mock_bot):
 async def test_help_command_hidden_command(help_cog, mock_ctx, mock_bot):
     """Test the help command with a hidden command"""
     # Create a mock hidden command
-    command = MagicMock(spec=commands.Command)
-    command.name = "hidden"
-    command.hidden = True
+    command = SimpleNamespace(name="hidden", hidden=True)
     
     # Set up the mock bot to return our hidden command
     mock_bot.get_command.return_value = command
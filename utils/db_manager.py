@@ -4,13 +4,16 @@ Handles all database operations including connection management and CRUD operati
 """
 
 import os
+import queue
 import sqlite3
 import logging
 import json
+import threading
 import time
 import functools
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple, Union, Callable
+from typing import Dict, List, Any, Optional, Tuple, Union, Callable, Iterable, Sequence
 
 logger = logging.getLogger("accountme_bot.db_manager")
 
@@ -21,23 +24,62 @@ class DatabaseManager:
     """
     
     # Current database schema version
-    CURRENT_VERSION = 3
+    CURRENT_VERSION = 4
     
-    def __init__(self, db_path: str = "data/database.db"):
+    # Columns that may be requested through list_products(fields=...)
+    PRODUCT_COLUMNS = frozenset([
+        'product_id', 'name', 'category', 'subcategory', 'manufacturer', 'vendor',
+        'style', 'color', 'size', 'sku', 'quantity', 'cost_price', 'selling_price',
+        'created_at', 'updated_at'
+    ])
+    
+    # Prepared statements kept per connection; every query is parameterized, so each
+    # method and filter combination maps to one SQL string that stays cached
+    STATEMENT_CACHE_SIZE = 256
+    
+    # Cache patterns cleared after adjust_product_quantity; the SKU lookup is keyed by SKU
+    # alone, so it does not match 'products'
+    ADJUST_QUANTITY_TABLES = ('products', '_get_product_by_sku_impl', 'audit_log', 'inventory_history')
+    
+    def __init__(self, db_path: str = "data/database.db", pool_size: int = 0):
         """
         Initialize the database manager
         
         Args:
-            db_path: Path to the SQLite database file
+            db_path: Path to the SQLite database file, ":memory:", or a "file:" URI such as
+                "file:name?mode=memory&cache=shared"
+            pool_size: Number of read-only connections to pool for SELECTs; values below 1
+                disable the pool and send every query through the single write connection.
+                Always disabled for ":memory:", which each connection would open empty
         """
         self.db_path = db_path
         self.connection = None
         
+        # "file:" paths are opened as SQLite URIs and have no directory to create
+        self._is_uri = db_path.startswith("file:")
+        
+        # Reader pool; connections are opened lazily up to pool_size
+        self.pool_size = 0 if db_path == ":memory:" else max(pool_size, 0)
+        self._read_pool = queue.LifoQueue()
+        self._reader_count = 0
+        self._pool_lock = threading.Lock()
+        # Set by close(); readers returned while it is set are closed instead of pooled
+        self._closed = False
+        
+        # Serializes use of the write connection
+        self._write_lock = threading.RLock()
+        
+        # Nesting depth of bulk() blocks; per-call commits are deferred while non-zero
+        self._bulk_depth = 0
+        # Cache patterns to clear when the outermost bulk() block ends; None clears everything
+        self._bulk_tables = None
+        
         # Initialize cache
         self.cache = {}
         self.cache_ttl = {}  # Time-to-live for cache entries
         self.default_ttl = 300  # Default TTL in seconds (5 minutes)
         self.max_cache_size = 100  # Maximum number of items in cache
+        self._cache_lock = threading.Lock()  # Guards cache and cache_ttl across threads
         
         self._initialize_database()
         self._apply_migrations()
@@ -51,10 +93,14 @@ class DatabaseManager:
         """
         if self.connection is None:
             # Ensure directory exists
-            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-            
-            # Create connection with row factory for dictionary-like results
-            self.connection = sqlite3.connect(self.db_path)
+            directory = os.path.dirname(self.db_path)
+            if directory and not self._is_uri:
+                os.makedirs(directory, exist_ok=True)
+            
+            # Create connection with row factory for dictionary-like results;
+            # access from other threads is serialized through write_conn()
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False, uri=self._is_uri,
+                                              cached_statements=self.STATEMENT_CACHE_SIZE)
             self.connection.row_factory = sqlite3.Row
             
             # Enable foreign keys
@@ -66,11 +112,153 @@ class DatabaseManager:
             # Set synchronous mode to NORMAL for better performance
             self.connection.execute("PRAGMA synchronous = NORMAL")
             
-            # Set cache size to 10000 pages (about 40MB)
-            self.connection.execute("PRAGMA cache_size = 10000")
+            self._apply_performance_pragmas(self.connection)
+            
+            # Reopening after close() (as restore_database does) pools readers again
+            self._closed = False
         
         return self.connection
     
+    @staticmethod
+    def _apply_performance_pragmas(conn: sqlite3.Connection) -> None:
+        """
+        Apply the per-connection cache, memory-mapping and locking settings
+        
+        Args:
+            conn: Connection to configure
+        """
+        # 64MB page cache
+        conn.execute("PRAGMA cache_size = -64000")
+        
+        # Keep temporary tables and sort spills in memory
+        conn.execute("PRAGMA temp_store = MEMORY")
+        
+        # Memory-map up to 256MB of the database file
+        conn.execute("PRAGMA mmap_size = 268435456")
+        
+        # Wait up to 5 seconds for locks held by other connections
+        conn.execute("PRAGMA busy_timeout = 5000")
+    
+    def _open_reader(self) -> sqlite3.Connection:
+        """
+        Open a pooled read-only connection
+        
+        Returns:
+            sqlite3.Connection: Autocommit connection that rejects writes
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                               uri=self._is_uri, cached_statements=self.STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        self._apply_performance_pragmas(conn)
+        return conn
+    
+    @contextmanager
+    def read_conn(self):
+        """
+        Check out a connection for running SELECT queries
+        
+        Uses the write connection when the pool is disabled, or while the write connection
+        has an open transaction so reads see its uncommitted changes.
+        
+        Yields:
+            sqlite3.Connection: Connection to read from
+        """
+        if self.pool_size < 1 or (self.connection is not None and self.connection.in_transaction):
+            with self.write_conn() as conn:
+                yield conn
+            return
+        
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_open = self._reader_count < self.pool_size
+                if can_open:
+                    self._reader_count += 1
+            conn = self._open_reader() if can_open else self._read_pool.get()
+        
+        try:
+            yield conn
+        finally:
+            with self._pool_lock:
+                if self._closed:
+                    conn.close()
+                    self._reader_count -= 1
+                else:
+                    self._read_pool.put(conn)
+    
+    @contextmanager
+    def write_conn(self):
+        """
+        Check out the write connection, holding the write lock
+        
+        Yields:
+            sqlite3.Connection: The single write connection
+        """
+        with self._write_lock:
+            yield self._get_connection()
+    
+    @contextmanager
+    def bulk(self, tables: Optional[Iterable[str]] = None):
+        """
+        Group many writes into a single transaction
+        
+        Writes made through this manager inside the block skip their individual commits;
+        everything is committed once on exit, or rolled back if the block raises.
+        
+        Args:
+            tables: Tables (cache key patterns) the block writes to; their cache entries are
+                cleared on exit. The whole cache is cleared if omitted.
+        
+        Yields:
+            sqlite3.Connection: The write connection, for executemany and other raw statements
+        """
+        with self.write_conn() as conn:
+            if self._bulk_depth == 0:
+                conn.execute("BEGIN IMMEDIATE")
+                self._bulk_tables = set()
+            if tables is None:
+                self._bulk_tables = None
+            elif self._bulk_tables is not None:
+                self._bulk_tables.update(tables)
+            self._bulk_depth += 1
+            try:
+                yield conn
+            except Exception:
+                self._bulk_depth -= 1
+                if self._bulk_depth == 0:
+                    conn.rollback()
+                    self._invalidate_bulk_tables()
+                raise
+            else:
+                self._bulk_depth -= 1
+                if self._bulk_depth == 0:
+                    conn.commit()
+                    # Raw statements run in the block bypass the per-table invalidation
+                    self._invalidate_bulk_tables()
+    
+    def _invalidate_bulk_tables(self) -> None:
+        """
+        Clear the cache entries written by the bulk() block that just ended
+        """
+        tables, self._bulk_tables = self._bulk_tables, None
+        if tables is None:
+            self._invalidate_cache()
+        else:
+            for table in tables:
+                self._invalidate_cache(table)
+    
+    def _commit(self, conn: sqlite3.Connection) -> None:
+        """
+        Commit a write unless it is part of a bulk() block
+        
+        Args:
+            conn: The write connection
+        """
+        if self._bulk_depth == 0:
+            conn.commit()
+    
     def _initialize_database(self) -> None:
         """
         Initialize the database by creating tables if they don't exist
@@ -192,10 +380,22 @@ class DatabaseManager:
         """
         Close the database connection
         """
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-            logger.info("Database connection closed")
+        # Close pooled readers; readers checked out now are closed by read_conn() when returned
+        with self._pool_lock:
+            self._closed = True
+            while True:
+                try:
+                    self._read_pool.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._reader_count -= 1
+        
+        # Wait for any thread using the write connection to finish with it
+        with self._write_lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+                logger.info("Database connection closed")
     
     # Cache management
     
@@ -226,17 +426,18 @@ class DatabaseManager:
         Returns:
             Cached value or None if not found or expired
         """
-        if key in self.cache:
-            # Check if the cache entry has expired
-            if key in self.cache_ttl and self.cache_ttl[key] < time.time():
-                # Remove expired entry
-                del self.cache[key]
-                del self.cache_ttl[key]
-                return None
+        with self._cache_lock:
+            if key in self.cache:
+                # Check if the cache entry has expired
+                if key in self.cache_ttl and self.cache_ttl[key] < time.time():
+                    # Remove expired entry
+                    self.cache.pop(key, None)
+                    self.cache_ttl.pop(key, None)
+                    return None
+                
+                return self.cache[key]
             
-            return self.cache[key]
-        
-        return None
+            return None
     
     def _set_in_cache(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """
@@ -247,18 +448,19 @@ class DatabaseManager:
             value: Value to cache
             ttl: Time-to-live in seconds (optional)
         """
-        # Manage cache size - remove oldest entry if cache is full
-        if len(self.cache) >= self.max_cache_size:
-            oldest_key = min(self.cache_ttl.keys(), key=lambda k: self.cache_ttl[k])
-            del self.cache[oldest_key]
-            del self.cache_ttl[oldest_key]
-        
-        # Set the value in cache
-        self.cache[key] = value
-        
-        # Set TTL
-        ttl_value = ttl if ttl is not None else self.default_ttl
-        self.cache_ttl[key] = time.time() + ttl_value
+        with self._cache_lock:
+            # Manage cache size - remove oldest entry if cache is full
+            if len(self.cache) >= self.max_cache_size and self.cache_ttl:
+                oldest_key = min(self.cache_ttl, key=self.cache_ttl.get)
+                self.cache.pop(oldest_key, None)
+                self.cache_ttl.pop(oldest_key, None)
+            
+            # Set the value in cache
+            self.cache[key] = value
+            
+            # Set TTL
+            ttl_value = ttl if ttl is not None else self.default_ttl
+            self.cache_ttl[key] = time.time() + ttl_value
     
     def _invalidate_cache(self, pattern: Optional[str] = None) -> None:
         """
@@ -269,16 +471,17 @@ class DatabaseManager:
         """
         if pattern is None:
             # Clear entire cache
-            self.cache.clear()
-            self.cache_ttl.clear()
+            with self._cache_lock:
+                self.cache.clear()
+                self.cache_ttl.clear()
             logger.debug("Cache cleared")
         else:
             # Clear entries matching pattern
-            keys_to_remove = [k for k in self.cache.keys() if pattern in k]
-            for key in keys_to_remove:
-                del self.cache[key]
-                if key in self.cache_ttl:
-                    del self.cache_ttl[key]
+            with self._cache_lock:
+                keys_to_remove = [k for k in self.cache if pattern in k]
+                for key in keys_to_remove:
+                    self.cache.pop(key, None)
+                    self.cache_ttl.pop(key, None)
             
             logger.debug(f"Cache entries matching '{pattern}' cleared ({len(keys_to_remove)} entries)")
     
@@ -326,13 +529,31 @@ class DatabaseManager:
             params: Query parameters
             
         Returns:
-            List of dictionaries representing rows
+            List of dictionaries representing rows; use raw_execute when keyed access
+            to the sqlite3.Row objects is enough
         """
-        conn = self._get_connection()
-        cursor = conn.execute(query, params)
-        results = [dict(row) for row in cursor.fetchall()]
+        with self.read_conn() as conn:
+            cursor = conn.execute(query, params)
+            results = [dict(row) for row in cursor.fetchall()]
         return results
     
+    def raw_execute(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """
+        Execute a SELECT query and return the rows as fetched
+        
+        Runs on a pooled read connection like execute_query, but skips the per-row dict
+        conversion.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters
+            
+        Returns:
+            List of sqlite3.Row objects
+        """
+        with self.read_conn() as conn:
+            return conn.execute(query, params).fetchall()
+    
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """
         Execute an UPDATE, INSERT, or DELETE query
@@ -344,9 +565,9 @@ class DatabaseManager:
         Returns:
             Number of rows affected
         """
-        conn = self._get_connection()
-        cursor = conn.execute(query, params)
-        conn.commit()
+        with self.write_conn() as conn:
+            cursor = conn.execute(query, params)
+            self._commit(conn)
         
         # Invalidate cache for affected table
         table_name = None
@@ -377,15 +598,39 @@ class DatabaseManager:
         placeholders = ', '.join(['?' for _ in data])
         query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
         
-        conn = self._get_connection()
-        cursor = conn.execute(query, tuple(data.values()))
-        conn.commit()
+        with self.write_conn() as conn:
+            cursor = conn.execute(query, tuple(data.values()))
+            self._commit(conn)
         
         # Invalidate cache for this table
         self._invalidate_cache(table)
         
         return cursor.lastrowid
     
+    def insert_many(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+        """
+        Insert many rows into a table through one prepared statement
+        
+        Args:
+            table: Table name
+            columns: Column names, in the order of the values in each row
+            rows: Iterable of row value sequences
+            
+        Returns:
+            Number of rows inserted
+        """
+        placeholders = ', '.join(['?' for _ in columns])
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        
+        with self.write_conn() as conn:
+            cursor = conn.executemany(query, rows)
+            self._commit(conn)
+        
+        # Invalidate cache for this table
+        self._invalidate_cache(table)
+        
+        return cursor.rowcount
+    
     def update(self, table: str, data: Dict[str, Any], condition: str, params: tuple) -> int:
         """
         Update rows in a table
@@ -404,9 +649,9 @@ class DatabaseManager:
         
         all_params = tuple(data.values()) + params
         
-        conn = self._get_connection()
-        cursor = conn.execute(query, all_params)
-        conn.commit()
+        with self.write_conn() as conn:
+            cursor = conn.execute(query, all_params)
+            self._commit(conn)
         
         # Invalidate cache for this table
         self._invalidate_cache(table)
@@ -427,9 +672,9 @@ class DatabaseManager:
         """
         query = f"DELETE FROM {table} WHERE {condition}"
         
-        conn = self._get_connection()
-        cursor = conn.execute(query, params)
-        conn.commit()
+        with self.write_conn() as conn:
+            cursor = conn.execute(query, params)
+            self._commit(conn)
         
         # Invalidate cache for this table
         self._invalidate_cache(table)
@@ -529,21 +774,33 @@ class DatabaseManager:
         return _get_product_by_sku_impl(sku)
     
     def list_products(self, category: Optional[str] = None,
-                     subcategory: Optional[str] = None) -> List[Dict[str, Any]]:
+                     subcategory: Optional[str] = None,
+                     fields: Optional[Tuple[str, ...]] = None) -> List[Dict[str, Any]]:
         """
         List products with optional filtering
         
         Args:
             category: Filter by category (optional)
             subcategory: Filter by subcategory (optional)
+            fields: Columns to select; all columns if omitted (optional)
             
         Returns:
             List of products as dictionaries
+            
+        Raises:
+            ValueError: If fields contains an unknown column name
         """
+        if fields is not None:
+            fields = tuple(fields)
+            unknown = [field for field in fields if field not in self.PRODUCT_COLUMNS]
+            if unknown or not fields:
+                raise ValueError(f"Invalid product fields: {', '.join(unknown) or '(empty)'}")
+        
         # Use the cached decorator for this frequently used method
         @self.cached()
-        def _list_products_impl(category, subcategory):
-            query = "SELECT * FROM products"
+        def _list_products_impl(category, subcategory, fields):
+            columns = ', '.join(fields) if fields else '*'
+            query = f"SELECT {columns} FROM products"
             params = []
             
             # Add filters if provided
@@ -563,7 +820,7 @@ class DatabaseManager:
             
             return self.execute_query(query, tuple(params))
         
-        return _list_products_impl(category, subcategory)
+        return _list_products_impl(category, subcategory, fields)
     
     def adjust_product_quantity(self, product_id: int, quantity_change: int,
                                user_id: str, reason: Optional[str] = None) -> bool:
@@ -579,44 +836,53 @@ class DatabaseManager:
         Returns:
             True if successful, False if product not found
         """
-        conn = self._get_connection()
-        
         try:
-            # Get current quantity
-            product = self.get_product(product_id)
-            if not product:
-                return False
-            
-            current_quantity = product['quantity']
-            new_quantity = current_quantity + quantity_change
-            
-            # Update quantity
-            self.update('products',
-                       {'quantity': new_quantity, 'updated_at': datetime.now().isoformat()},
-                       'product_id = ?',
-                       (product_id,))
-            
-            # Log the adjustment in audit log
-            details = f"Quantity changed from {current_quantity} to {new_quantity}"
-            if reason:
-                details += f". Reason: {reason}"
-            
-            self.log_audit('adjust_quantity', 'product', product_id, user_id, details)
-            
-            # Record in inventory history
-            self.add_inventory_history(
-                product_id,
-                current_quantity,
-                new_quantity,
-                quantity_change,
-                reason,
-                user_id
-            )
+            # The update, audit entry and history row commit together; the savepoint
+            # undoes them alone if this runs inside a caller's bulk() block
+            with self.bulk(self.ADJUST_QUANTITY_TABLES) as conn:
+                # Get current quantity
+                product = self.get_product(product_id)
+                if not product:
+                    return False
+                
+                current_quantity = product['quantity']
+                new_quantity = current_quantity + quantity_change
+                
+                conn.execute("SAVEPOINT adjust_quantity")
+                try:
+                    # Update quantity
+                    self.update('products',
+                               {'quantity': new_quantity, 'updated_at': datetime.now().isoformat()},
+                               'product_id = ?',
+                               (product_id,))
+                    
+                    # Log the adjustment in audit log
+                    details = f"Quantity changed from {current_quantity} to {new_quantity}"
+                    if reason:
+                        details += f". Reason: {reason}"
+                    
+                    self.log_audit('adjust_quantity', 'product', product_id, user_id, details)
+                    
+                    # Record in inventory history
+                    self.add_inventory_history(
+                        product_id,
+                        current_quantity,
+                        new_quantity,
+                        quantity_change,
+                        reason,
+                        user_id
+                    )
+                except Exception:
+                    conn.execute("ROLLBACK TO SAVEPOINT adjust_quantity")
+                    conn.execute("RELEASE SAVEPOINT adjust_quantity")
+                    self._invalidate_cache('products')
+                    raise
+                
+                conn.execute("RELEASE SAVEPOINT adjust_quantity")
             
             return True
         except Exception as e:
             logger.error(f"Error adjusting product quantity: {str(e)}")
-            conn.rollback()
             return False
             
     def add_inventory_history(self, product_id: int, previous_quantity: int,
@@ -881,47 +1147,56 @@ class DatabaseManager:
         Returns:
             ID of the new sale
         """
-        conn = self._get_connection()
-        
-        # Start transaction
-        conn.execute("BEGIN")
-        
-        try:
-            # Insert sale
-            sale_id = self.insert('sales', sale_data)
+        # Hold the write connection for the whole sale so other threads cannot interleave
+        with self.write_conn() as conn:
+            # Start transaction; inside a bulk() block use a savepoint so a failed
+            # sale does not discard the rest of the bulk transaction
+            in_bulk = self._bulk_depth > 0
+            conn.execute("SAVEPOINT add_sale" if in_bulk else "BEGIN")
             
-            # Insert sale items
-            for item in sale_items:
-                item['sale_id'] = sale_id
-                self.insert('sale_items', item)
+            try:
+                # Insert sale
+                sale_id = self.insert('sales', sale_data)
                 
-                # Update product quantity
-                product_id = item['product_id']
-                quantity = item['quantity']
+                # Insert sale items
+                for item in sale_items:
+                    item['sale_id'] = sale_id
+                    self.insert('sale_items', item)
+                    
+                    # Update product quantity
+                    product_id = item['product_id']
+                    quantity = item['quantity']
+                    
+                    # Decrease product quantity
+                    product = self.get_product(product_id)
+                    if product:
+                        new_quantity = product['quantity'] - quantity
+                        self.update('products',
+                                   {'quantity': new_quantity, 'updated_at': datetime.now().isoformat()},
+                                   'product_id = ?',
+                                   (product_id,))
                 
-                # Decrease product quantity
-                product = self.get_product(product_id)
-                if product:
-                    new_quantity = product['quantity'] - quantity
-                    self.update('products',
-                               {'quantity': new_quantity, 'updated_at': datetime.now().isoformat()},
-                               'product_id = ?',
-                               (product_id,))
-            
-            # Commit transaction
-            conn.commit()
-            
-            # Invalidate relevant caches
-            self._invalidate_cache('sales')
-            self._invalidate_cache('sale_items')
-            self._invalidate_cache('products')
-            
-            return sale_id
-        except Exception as e:
-            # Rollback on error
-            conn.rollback()
-            logger.error(f"Error adding sale: {str(e)}")
-            raise
+                # Commit transaction
+                if in_bulk:
+                    conn.execute("RELEASE SAVEPOINT add_sale")
+                else:
+                    conn.commit()
+                
+                # Invalidate relevant caches
+                self._invalidate_cache('sales')
+                self._invalidate_cache('sale_items')
+                self._invalidate_cache('products')
+                
+                return sale_id
+            except Exception as e:
+                # Rollback on error
+                if in_bulk:
+                    conn.execute("ROLLBACK TO SAVEPOINT add_sale")
+                    conn.execute("RELEASE SAVEPOINT add_sale")
+                else:
+                    conn.rollback()
+                logger.error(f"Error adding sale: {str(e)}")
+                raise
     
     def get_sale(self, sale_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -1071,7 +1346,7 @@ class DatabaseManager:
         """
         # Check if the checksum column exists
         check_query = "PRAGMA table_info(backup_log)"
-        columns = self.execute_query(check_query)
+        columns = self.raw_execute(check_query)
         column_names = [col['name'] for col in columns]
         
         if 'checksum' not in column_names:
@@ -1220,6 +1495,11 @@ class DatabaseManager:
             CREATE INDEX IF NOT EXISTS idx_audit_log_entity_id ON audit_log(entity_id);
             CREATE INDEX IF NOT EXISTS idx_audit_log_user_id ON audit_log(user_id);
             CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp);
+            """,
+            
+            # Migration to index backup timestamps for retention cleanup and listing
+            4: """
+            CREATE INDEX IF NOT EXISTS idx_backup_log_timestamp ON backup_log(timestamp);
             """
         }
         
@@ -1250,11 +1530,10 @@ class DatabaseManager:
         backup_filename = f"accountme_backup_{timestamp}.db"
         backup_path = os.path.join(backup_dir, backup_filename)
         
-        conn = self._get_connection()
-        
         # Create a backup using SQLite's backup API
         backup_conn = sqlite3.connect(backup_path)
-        conn.backup(backup_conn)
+        with self.write_conn() as conn:
+            conn.backup(backup_conn)
         backup_conn.close()
         
         # Calculate SHA-256 checksum for integrity verification
@@ -1279,7 +1558,7 @@ class DatabaseManager:
         for table in ["products", "expenses", "customers", "sales", "sale_items", "audit_log", "backup_log", "inventory_history"]:
             try:
                 count_query = f"SELECT COUNT(*) FROM {table}"
-                result = self.execute_query(count_query)
+                result = self.raw_execute(count_query)
                 metadata["tables"][table] = result[0]["COUNT(*)"] if result else 0
             except Exception as e:
                 logger.error(f"Error getting count for table {table}: {str(e)}")
@@ -1404,7 +1683,7 @@ class DatabaseManager:
                 
                 # Find the backup record
                 query = "SELECT backup_id FROM backup_log WHERE filename = ? ORDER BY backup_id DESC LIMIT 1"
-                result = self.execute_query(query, (backup_filename,))
+                result = self.raw_execute(query, (backup_filename,))
                 
                 if result:
                     backup_id = result[0]['backup_id']
@@ -1461,7 +1740,7 @@ class DatabaseManager:
                     
                     # Find the backup record
                     query = "SELECT backup_id FROM backup_log WHERE filename = ? ORDER BY backup_id DESC LIMIT 1"
-                    result = self.execute_query(query, (backup_filename,))
+                    result = self.raw_execute(query, (backup_filename,))
                     
                     if result:
                         backup_id = result[0]['backup_id']
@@ -1605,54 +1884,60 @@ class DatabaseManager:
                 
                 logger.info(f"Backup integrity verified: {backup_path}")
             
-            # Close current connection
-            self.close()
-            
-            try:
-                # Create a new connection to the backup
-                backup_conn = sqlite3.connect(actual_db_path)
-                
-                # Create a new connection to the target database
-                conn = sqlite3.connect(self.db_path)
-                
-                # Restore using SQLite's backup API
-                backup_conn.backup(conn)
-                
-                # Close connections
-                backup_conn.close()
-                conn.close()
+            # Hold the write lock from closing the connection until it is reopened, so
+            # threads using the manager wait instead of touching a closed connection
+            with self._write_lock:
+                # Close current connection
+                self.close()
                 
-                logger.info(f"Database successfully restored from {backup_path}")
-                
-                # Update backup record to mark as verified if we have a backup ID
-                if metadata_path:
-                    try:
-                        backup_filename = os.path.basename(backup_path)
-                        self._get_connection()  # Reconnect to the database
-                        
-                        # Find the backup record
-                        query = "SELECT backup_id FROM backup_log WHERE filename = ? ORDER BY backup_id DESC LIMIT 1"
-                        result = self.execute_query(query, (backup_filename,))
-                        
-                        if result:
-                            backup_id = result[0]['backup_id']
-                            self.update('backup_log',
-                                      {'verified': 1, 'verification_date': datetime.now().isoformat()},
-                                      'backup_id = ?', (backup_id,))
-                            logger.info(f"Marked backup {backup_id} as verified")
-                    except Exception as e:
-                        logger.warning(f"Could not update backup verification status: {str(e)}")
-                
-                # Clear cache after restore
-                self._invalidate_cache()
-                
-                return True
-            except Exception as e:
-                logger.error(f"Error restoring database: {str(e)}")
-                return False
-            finally:
-                # Reconnect to the database
-                self._get_connection()
+                try:
+                    # Create a new connection to the backup
+                    backup_conn = sqlite3.connect(actual_db_path)
+                    
+                    # Create a new connection to the target database, opening "file:" URIs
+                    # the same way as the main and reader connections
+                    conn = sqlite3.connect(self.db_path, uri=self._is_uri)
+                    
+                    # Restore using SQLite's backup API
+                    backup_conn.backup(conn)
+                    
+                    # Reconnect before closing the restore connection; a shared in-memory
+                    # database is freed as soon as its last connection closes
+                    backup_conn.close()
+                    self._get_connection()
+                    conn.close()
+                    
+                    logger.info(f"Database successfully restored from {backup_path}")
+                    
+                    # Update backup record to mark as verified if we have a backup ID
+                    if metadata_path:
+                        try:
+                            backup_filename = os.path.basename(backup_path)
+                            self._get_connection()  # Reconnect to the database
+                            
+                            # Find the backup record
+                            query = "SELECT backup_id FROM backup_log WHERE filename = ? ORDER BY backup_id DESC LIMIT 1"
+                            result = self.raw_execute(query, (backup_filename,))
+                            
+                            if result:
+                                backup_id = result[0]['backup_id']
+                                self.update('backup_log',
+                                          {'verified': 1, 'verification_date': datetime.now().isoformat()},
+                                          'backup_id = ?', (backup_id,))
+                                logger.info(f"Marked backup {backup_id} as verified")
+                        except Exception as e:
+                            logger.warning(f"Could not update backup verification status: {str(e)}")
+                    
+                    # Clear cache after restore
+                    self._invalidate_cache()
+                    
+                    return True
+                except Exception as e:
+                    logger.error(f"Error restoring database: {str(e)}")
+                    return False
+                finally:
+                    # Reconnect to the database
+                    self._get_connection()
         
         finally:
             # Clean up temporary directory if it was created